@@ -0,0 +1,248 @@
+"""
+Benchmark suite against the bundled device emulator.
+
+Run from the native-python directory:
+
+    python -m benchmarks.bench --out results.json
+
+The emulator runs in a separate process so that client CPU time is not
+mixed with the emulator's own work.
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from kmboxnet import KmboxNet
+from kmboxnet.emulator import MONITOR_REPORT
+from kmboxnet.monitor import Monitor
+
+UUID = "11223344"
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[index]
+
+
+def summarize(rtts: list[float], wall: float, cpu: float, ok: int) -> dict:
+    rtts = sorted(rtts)
+    count = len(rtts)
+    return {
+        "count": count,
+        "ok": ok,
+        "commands_per_sec": count / wall if wall else 0.0,
+        "rtt_us": {
+            "p50": percentile(rtts, 0.50) * 1e6,
+            "p99": percentile(rtts, 0.99) * 1e6,
+            "p999": percentile(rtts, 0.999) * 1e6,
+            "max": (rtts[-1] if rtts else 0.0) * 1e6,
+            "mean": (sum(rtts) / count if count else 0.0) * 1e6,
+        },
+        "cpu_us_per_command": cpu / count * 1e6 if count else 0.0,
+    }
+
+
+def run_command(func, count: int) -> dict:
+    """Call func() count times, recording wall RTT and process CPU"""
+    rtts = []
+    ok = 0
+    perf_counter = time.perf_counter
+    cpu_start = time.process_time()
+    wall_start = perf_counter()
+    for i in range(count):
+        t0 = perf_counter()
+        if func(i):
+            ok += 1
+        rtts.append(perf_counter() - t0)
+    wall = perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    return summarize(rtts, wall, cpu, ok)
+
+
+def start_emulator(args) -> tuple[subprocess.Popen, int]:
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "kmboxnet.emulator",
+            "--port",
+            "0",
+            "--uuid",
+            UUID,
+            "--latency",
+            str(args.latency),
+            "--jitter",
+            str(args.jitter),
+            "--loss",
+            str(args.loss),
+            "--seed",
+            str(args.seed),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = proc.stdout.readline()
+    port = int(line.rsplit(":", 1)[1])
+    return proc, port
+
+
+def bench_commands(args, port: int) -> dict:
+    km = KmboxNet("127.0.0.1", port, UUID, monitor_port=None, window=args.window)
+    image = bytes(range(256)) * 160
+    results = {
+        "move": run_command(lambda i: km.move(1, -1), args.count),
+        "key_down_up": run_command(
+            lambda i: km.key_down(0x04) if i % 2 == 0 else km.key_up(0x04),
+            args.count,
+        ),
+        "mouse_all": run_command(lambda i: km.mouse_all(i & 1, 1, 1, 0), args.count),
+    }
+    frames = max(1, args.count // 40)
+    frame = run_command(lambda i: km.lcd_picture(image, full_refresh=True), frames)
+    frame["stripes_per_sec"] = frame["commands_per_sec"] * 40
+    results["lcd_picture"] = frame
+    return results
+
+
+def _blast_reports(port: int, count: int, rate_hz: float):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    report = MONITOR_REPORT.pack(1, 0, 1, 0, 0, 1, 0, *([0] * 10))
+    interval = 1.0 / rate_hz if rate_hz else 0.0
+    next_time = time.perf_counter()
+    for _ in range(count):
+        if interval:
+            next_time += interval
+            while time.perf_counter() < next_time:
+                pass
+        sock.sendto(report, ("127.0.0.1", port))
+    sock.close()
+
+
+def bench_monitor(args) -> dict:
+    # cost of the listener's per-report path (_ingest), without any socket;
+    # alternating reports so edge and key bitmap work is included
+    monitor = Monitor(0)
+    packets = (
+        MONITOR_REPORT.pack(1, 1, 5, -5, 1, 1, 2, 4, 5, 0, 0, 0, 0, 0, 0, 0, 0),
+        MONITOR_REPORT.pack(1, 0, -5, 5, 0, 1, 0, 4, 0, 0, 0, 0, 0, 0, 0, 0, 0),
+    )
+    n = args.count * 10
+    ingest = monitor._ingest
+    perf_counter = time.perf_counter
+    cpu_start = time.process_time()
+    for i in range(n):
+        ingest(packets[i & 1], perf_counter())
+    ingest_cpu = time.process_time() - cpu_start
+
+    # ingest through the listener thread at increasing send rates
+    rates = []
+    for rate_hz in args.monitor_rates:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        monitor = Monitor(port, monitor_timeout=None)
+        monitor.start()
+        count = int(rate_hz * args.monitor_seconds) if rate_hz else args.count * 10
+        sender = multiprocessing.Process(
+            target=_blast_reports, args=(port, count, rate_hz)
+        )
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        sender.start()
+        sender.join()
+        time.sleep(0.1)
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        received = monitor.events.qsize()
+        monitor.stop()
+        rates.append(
+            {
+                "target_hz": rate_hz,
+                "sent": count,
+                "received": received,
+                "drop_ratio": 1.0 - received / count if count else 0.0,
+                "received_per_sec": received / wall if wall else 0.0,
+                "cpu_us_per_packet": cpu / received * 1e6 if received else 0.0,
+            }
+        )
+
+    sustained = 0.0
+    for entry in rates:
+        if entry["target_hz"] and entry["drop_ratio"] <= 0.001:
+            sustained = max(sustained, entry["target_hz"])
+
+    return {
+        "ingest_call_per_sec": n / ingest_cpu if ingest_cpu else 0.0,
+        "ingest_call_cpu_us": ingest_cpu / n * 1e6,
+        "ingest": rates,
+        "sustained_hz": sustained,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="kmboxnet benchmark suite")
+    parser.add_argument(
+        "--out", default=None, help="JSON output path (stdout if omitted)"
+    )
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--window", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--loss", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--monitor-rates",
+        type=float,
+        nargs="*",
+        default=[1000, 2000, 4000, 8000, 16000, 32000, 0],
+        help="monitor report rates in Hz; 0 sends as fast as possible",
+    )
+    parser.add_argument("--monitor-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    proc, port = start_emulator(args)
+    try:
+        commands = bench_commands(args, port)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    try:
+        from importlib.metadata import version
+
+        kmboxnet_version = version("kmboxnet")
+    except Exception:
+        kmboxnet_version = "unknown"
+
+    result = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "kmboxnet": kmboxnet_version,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "params": vars(args),
+        },
+        "commands": commands,
+        "monitor": bench_monitor(args),
+    }
+
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
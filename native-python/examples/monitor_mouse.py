@@ -8,24 +8,25 @@ try:
     for i in range(200):
         time.sleep(0.01)
 
-        if kmbox.monitor.left:
+        # one consistent state per tick instead of one property read per field
+        state = kmbox.monitor.snapshot()
+
+        if state.left:
             print("Left button pressed!")
-        if kmbox.monitor.right:
+        if state.right:
             print("Right button pressed!")
-        if kmbox.monitor.middle:
+        if state.middle:
             print("Middle button pressed!")
-        if kmbox.monitor.side1:
+        if state.side1:
             print("Side1 button pressed!")
-        if kmbox.monitor.side2:
+        if state.side2:
             print("Side2 button pressed!")
 
-        x, y = kmbox.monitor.move
-        if x != 0 or y != 0:
-            print(f"Mouse moved: ({x}, {y})")
+        if state.x != 0 or state.y != 0:
+            print(f"Mouse moved: ({state.x}, {state.y})")
 
-        wheel = kmbox.monitor.wheel
-        if wheel != 0:
-            print(f"Wheel: {wheel}")
+        if state.wheel != 0:
+            print(f"Wheel: {state.wheel}")
 
 except KeyboardInterrupt:
     print("\nTest stopped.")
@@ -1,5 +1,25 @@
-from .kmbox import KmboxNet
+from .kmbox import CommandHandle, KmboxNet
+from .aio import AsyncKmboxNet
+from .coalesce import MotionCoalescer
+from .trajectory import Trajectory, TrajectoryPlayer
 from .hidtable import HidKey
-from .monitor import HardKeyboard, HardMouse, Event
+from .monitor import HardKeyboard, HardMouse, Event, MonitorState, MotionDelta
+from .subscriptions import InputEdge
+from .pool import KmboxPool
 
-__all__ = ["KmboxNet", "HidKey", "HardKeyboard", "HardMouse", "Event"]
+__all__ = [
+    "KmboxNet",
+    "CommandHandle",
+    "AsyncKmboxNet",
+    "MotionCoalescer",
+    "Trajectory",
+    "TrajectoryPlayer",
+    "HidKey",
+    "HardKeyboard",
+    "HardMouse",
+    "Event",
+    "MonitorState",
+    "MotionDelta",
+    "InputEdge",
+    "KmboxPool",
+]
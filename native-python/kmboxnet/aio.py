@@ -0,0 +1,602 @@
+import asyncio
+import ipaddress
+import struct
+import time
+from typing import Optional
+
+from .kmbox import (
+    CMD_BEZIER_MOVE,
+    CMD_CONNECT,
+    CMD_DEBUG,
+    CMD_KEYBOARD_ALL,
+    CMD_MASK_MOUSE,
+    CMD_MONITOR,
+    CMD_MOUSE_AUTOMOVE,
+    CMD_MOUSE_LEFT,
+    CMD_MOUSE_MIDDLE,
+    CMD_MOUSE_MOVE,
+    CMD_MOUSE_RIGHT,
+    CMD_MOUSE_WHEEL,
+    CMD_REBOOT,
+    CMD_SETCONFIG,
+    CMD_SETVIDPID,
+    CMD_SHOWPIC,
+    CMD_TRACE_ENABLE,
+    CMD_UNMASK_ALL,
+    IDEMPOTENT_COMMANDS,
+    KmboxError,
+    RttEstimator,
+    SoftKeyboard,
+    SoftMouse,
+    _mac_from_uuid,
+)
+from .codec import HEADER, nonce
+from .lcd import FRAME_SIZE, STRIPE_ROWS, STRIPES, LcdShadow, LcdUpload
+from .monitor import Monitor
+
+
+class _KmboxProtocol(asyncio.DatagramProtocol):
+    """Resolves pending command futures by header index"""
+
+    def __init__(self):
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.pending: dict[int, tuple[int, asyncio.Future]] = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr):
+        if len(data) < 16:
+            return
+        _, _, resp_index, resp_cmd = HEADER.unpack_from(data)
+        entry = self.pending.pop(resp_index, None)
+        if entry is None:
+            return
+        cmd, future = entry
+        if future.done():
+            return
+        if resp_cmd != cmd:
+            future.set_exception(KmboxError("Invalid Response"))
+        else:
+            future.set_result(data)
+
+    def error_received(self, exc: Exception):
+        # ICMP errors (e.g. port unreachable) are reported here; commands
+        # still fail through their own timeout.
+        pass
+
+    def connection_lost(self, exc: Optional[Exception]):
+        for _, future in self.pending.values():
+            if not future.done():
+                future.set_exception(exc or KmboxError("Connection closed"))
+        self.pending.clear()
+
+
+def _expire(future: asyncio.Future):
+    if not future.done():
+        future.set_exception(TimeoutError())
+
+
+class AsyncKmboxNet:
+    """asyncio version of KmboxNet. Every command is a coroutine."""
+
+    TIMEOUT = 2.0
+
+    def __init__(
+        self,
+        ip: str,
+        port: int,
+        uuid: str,
+        window: int = 16,
+        retries: int = 0,
+        lcd_window: int = 8,
+        lcd_retries: int = 3,
+    ):
+        """
+        Create an unconnected client. Use `await AsyncKmboxNet.connect(...)`.
+
+        Args:
+            ip (str): Your Kmbox device IP address
+            port (int): Your Kmbox device port number
+            uuid (str): Your Kmbox device UUID (8 digit hexadecimal)
+            window (int, optional): Max commands in flight at once; further calls wait for a slot. Defaults to 16.
+            retries (int, optional): Retransmits of an unanswered idempotent command (IDEMPOTENT_COMMANDS), paced by the adaptive RTO. Defaults to 0.
+            lcd_window (int, optional): Max LCD stripes in flight during a frame upload. Defaults to 8.
+            lcd_retries (int, optional): Retransmits of an unanswered LCD stripe. Defaults to 3.
+
+        Raises:
+            KmboxError: If UUID is invalid
+        """
+        self.mac = _mac_from_uuid(uuid)
+        self._server_addr = (ip, port)
+
+        self._index = 0
+        self._soft_mouse = SoftMouse()
+        self._soft_keyboard = SoftKeyboard()
+        # what the LCD shows, so unchanged stripes are not sent again
+        self.lcd_shadow = LcdShadow()
+        # max LCD stripes in flight during a frame upload, independent of window
+        self.lcd_window = max(1, lcd_window)
+        self.lcd_retries = max(0, lcd_retries)
+        self.last_lcd_upload: LcdUpload | None = None
+        self.mask_flag = 0
+
+        self.window = max(1, window)
+        self._window = asyncio.Semaphore(self.window)
+        # adaptive retransmission; with retries=0 a command simply waits TIMEOUT
+        self.retries = max(0, retries)
+        self.rtt = RttEstimator(max_rto=self.TIMEOUT)
+
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._protocol: Optional[_KmboxProtocol] = None
+        self.monitor: Monitor | None = None
+
+    @classmethod
+    async def connect(
+        cls,
+        ip: str,
+        port: int,
+        uuid: str,
+        monitor_port: int | None = 5002,
+        monitor_timeout: Optional[float] = 0.003,
+        monitor_options: Optional[dict] = None,
+        window: int = 16,
+        retries: int = 0,
+        lcd_window: int = 8,
+        lcd_retries: int = 3,
+    ) -> "AsyncKmboxNet":
+        """
+        Connect to Kmbox device.
+
+        Args:
+            ip (str): Your Kmbox device IP address
+            port (int): Your Kmbox device port number
+            uuid (str): Your Kmbox device UUID (8 digit hexadecimal)
+            monitor_port (int|None, optional): Monitor port number. None to disable. Defaults to 5002.
+            monitor_timeout (float, optional): Monitor timeout in seconds. Defaults to 0.003.
+            monitor_options (dict|None, optional): Other Monitor arguments (bind_address, rcvbuf, reuse_port, kernel_timestamps, ...). Defaults to None.
+            window (int, optional): Max commands in flight at once. Defaults to 16.
+            retries (int, optional): Retransmits of an unanswered command. Defaults to 0.
+            lcd_window (int, optional): Max LCD stripes in flight during a frame upload. Defaults to 8.
+            lcd_retries (int, optional): Retransmits of an unanswered LCD stripe. Defaults to 3.
+
+        Returns:
+            AsyncKmboxNet: Connected client
+
+        Raises:
+            KmboxError: If UUID is invalid or connection fails
+        """
+        self = cls(ip, port, uuid, window, retries, lcd_window, lcd_retries)
+        loop = asyncio.get_running_loop()
+        try:
+            self._transport, self._protocol = await loop.create_datagram_endpoint(
+                _KmboxProtocol, remote_addr=self._server_addr
+            )
+        except Exception as e:
+            raise KmboxError(e)
+
+        # send connectet command
+        result, _ = await self.send_cmd(CMD_CONNECT)
+        if result is False:
+            self.close()
+            raise KmboxError("Connection failture.")
+
+        # start monitor
+        if monitor_port is not None:
+            try:
+                rand_override = monitor_port | (0xAA55 << 16)
+                result, _ = await self.send_cmd(
+                    CMD_MONITOR, rand_override=rand_override
+                )
+
+                if result:
+                    self.monitor = Monitor(
+                        monitor_port, monitor_timeout, **(monitor_options or {})
+                    )
+                    self.monitor.start()
+                    await asyncio.sleep(0.01)
+                else:
+                    raise KmboxError("Device monitor setup failed")
+
+            except Exception as e:
+                print(f"monitor start error: {e}")
+
+        return self
+
+    def _make_header(self, cmd: int, rand_override: int | None = None) -> bytes:
+        self._index += 1
+        if rand_override is None:
+            rand_override = nonce()
+        return HEADER.pack(self.mac, rand_override, self._index, cmd)
+
+    async def send_cmd(
+        self, cmd: int, payload: bytes = b"", rand_override: int | None = None
+    ) -> tuple[bool, bytes]:
+        """
+        Send directly command to Kmbox device.
+
+        Args:
+            cmd (int): Command ID to send
+            payload (bytes, optional): Command payload data. Defaults to b''.
+            rand_override (int | None, optional): Override random value. Defaults to None.
+
+        Up to `window` commands are in flight at once; further calls wait for
+        a slot.
+
+        Returns:
+            tuple[bool, bytes]: (Success status, Response data)
+        """
+        async with self._window:
+            result, data, _ = await self._request(cmd, payload, rand_override)
+        return result, data
+
+    async def _request(
+        self,
+        cmd: int,
+        payload: bytes = b"",
+        rand_override: int | None = None,
+        retries: int | None = None,
+    ) -> tuple[bool, bytes, int]:
+        """
+        Send one command outside the window and await its answer, resending
+        it when the adaptive RTO expires (retries overrides the client's).
+        Commands outside IDEMPOTENT_COMMANDS are never resent.
+
+        Returns:
+            tuple[bool, bytes, int]: (Success status, Response data, Retransmits)
+        """
+        if self._transport is None or self._protocol is None:
+            return False, b"", 0
+        if cmd not in IDEMPOTENT_COMMANDS:
+            retries = 0
+        elif retries is None:
+            retries = self.retries
+
+        packet = self._make_header(cmd, rand_override) + payload
+        index = self._index
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._protocol.pending[index] = (cmd, future)
+        timer = loop.call_later(self.TIMEOUT, _expire, future)
+        attempts = 0
+        try:
+            sent_at = time.perf_counter()
+            self._transport.sendto(packet)
+            rto = self.rtt.rto
+            while True:
+                try:
+                    if attempts < retries:
+                        data = await asyncio.wait_for(asyncio.shield(future), rto)
+                    else:
+                        data = await future
+                    break
+                except asyncio.TimeoutError:
+                    if future.done():
+                        # answered or expired just as the RTO fired; result()
+                        # raises the TIMEOUT expiry (same class on 3.11+)
+                        data = future.result()
+                        break
+                    attempts += 1
+                    rto = self.rtt.backoff(rto)
+                    self._transport.sendto(packet)
+            if attempts == 0:
+                # Karn: answers of retransmitted commands are ambiguous samples
+                self.rtt.update(time.perf_counter() - sent_at)
+            return True, data, attempts
+        except TimeoutError:
+            print("Command Timeout, Kmbox net is not connected?")
+            return False, b"", attempts
+        except KmboxError as e:
+            print(f"Warning:{e}")
+            return False, b"", attempts
+        except Exception as e:
+            print(f"Error:{e}")
+            return False, b"", attempts
+        finally:
+            timer.cancel()
+            self._protocol.pending.pop(index, None)
+
+    async def move(self, x: int, y: int) -> bool:
+        """Move mouse cursor relatively"""
+        self._soft_mouse.x = x
+        self._soft_mouse.y = y
+        payload = self._soft_mouse.to_payload()
+        self._soft_mouse.reset_movement()
+
+        result, _ = await self.send_cmd(CMD_MOUSE_MOVE, payload)
+        return result
+
+    async def move_auto(self, x: int, y: int, ms: int) -> bool:
+        """Move mouse cursor automatically over specified duration"""
+        self._soft_mouse.x = x
+        self._soft_mouse.y = y
+        payload = self._soft_mouse.to_payload()
+        self._soft_mouse.reset_movement()
+
+        result, _ = await self.send_cmd(CMD_MOUSE_AUTOMOVE, payload, rand_override=ms)
+        return result
+
+    async def move_bezier(
+        self, x: int, y: int, ms: int, x1: int, y1: int, x2: int, y2: int
+    ) -> bool:
+        """Move mouse cursor using Bezier curve"""
+        self._soft_mouse.x = x
+        self._soft_mouse.y = y
+        self._soft_mouse.point[0] = x1
+        self._soft_mouse.point[1] = y1
+        self._soft_mouse.point[2] = x2
+        self._soft_mouse.point[3] = y2
+        payload = self._soft_mouse.to_payload()
+        self._soft_mouse.reset_movement()
+
+        result, _ = await self.send_cmd(CMD_BEZIER_MOVE, payload, rand_override=ms)
+        return result
+
+    async def left(self, is_down: bool) -> bool:
+        """Left mouse button"""
+        self._soft_mouse.set_button(0x01, is_down)
+        result, _ = await self.send_cmd(CMD_MOUSE_LEFT, self._soft_mouse.to_payload())
+        return result
+
+    async def right(self, is_down: bool) -> bool:
+        """Right mouse button"""
+        self._soft_mouse.set_button(0x02, is_down)
+        result, _ = await self.send_cmd(CMD_MOUSE_RIGHT, self._soft_mouse.to_payload())
+        return result
+
+    async def middle(self, is_down: bool) -> bool:
+        """Middle mouse button"""
+        self._soft_mouse.set_button(0x04, is_down)
+        result, _ = await self.send_cmd(CMD_MOUSE_MIDDLE, self._soft_mouse.to_payload())
+        return result
+
+    async def wheel(self, wheel_value: int) -> bool:
+        """Scroll mouse wheel"""
+        self._soft_mouse.wheel = wheel_value
+        payload = self._soft_mouse.to_payload()
+        self._soft_mouse.wheel = 0
+
+        result, _ = await self.send_cmd(CMD_MOUSE_WHEEL, payload)
+        return result
+
+    async def mouse_all(self, button: int, x: int, y: int, wheel: int) -> bool:
+        """All mouse operations in one command"""
+        self._soft_mouse.button = button
+        self._soft_mouse.x = x
+        self._soft_mouse.y = y
+        self._soft_mouse.wheel = wheel
+        payload = self._soft_mouse.to_payload()
+        self._soft_mouse.reset_movement()
+
+        result, _ = await self.send_cmd(CMD_MOUSE_WHEEL, payload)
+        return result
+
+    async def key_down(self, vk_key: int) -> bool:
+        """Press key down"""
+        self._soft_keyboard.press(vk_key)
+        result, _ = await self.send_cmd(
+            CMD_KEYBOARD_ALL, self._soft_keyboard.to_payload()
+        )
+        return result
+
+    async def key_up(self, vk_key: int) -> bool:
+        """Release key"""
+        self._soft_keyboard.release(vk_key)
+        result, _ = await self.send_cmd(
+            CMD_KEYBOARD_ALL, self._soft_keyboard.to_payload()
+        )
+        return result
+
+    async def keyboard_all(self, ctrl: int, keys: list[int]) -> bool:
+        """Set the whole keyboard state in one command"""
+        self._soft_keyboard.ctrl = ctrl
+        self._soft_keyboard.button = (list(keys) + [0] * 10)[:10]
+        result, _ = await self.send_cmd(
+            CMD_KEYBOARD_ALL, self._soft_keyboard.to_payload()
+        )
+        return result
+
+    async def _mask_mouse(self, bit: int, enable: bool) -> bool:
+        if enable:
+            self.mask_flag |= bit
+        else:
+            self.mask_flag &= ~bit
+        result, _ = await self.send_cmd(CMD_MASK_MOUSE, rand_override=self.mask_flag)
+        return result
+
+    async def mask_left(self, enable: bool) -> bool:
+        """Mask/unmask left mouse button"""
+        return await self._mask_mouse(0x01, enable)  # BIT0
+
+    async def mask_right(self, enable: bool) -> bool:
+        """Mask/unmask right mouse button"""
+        return await self._mask_mouse(0x02, enable)  # BIT1
+
+    async def mask_middle(self, enable: bool) -> bool:
+        """Mask/unmask middle mouse button"""
+        return await self._mask_mouse(0x04, enable)  # BIT2
+
+    async def mask_side1(self, enable: bool) -> bool:
+        """Mask/unmask side button 1"""
+        return await self._mask_mouse(0x08, enable)  # BIT3
+
+    async def mask_side2(self, enable: bool) -> bool:
+        """Mask/unmask side button 2"""
+        return await self._mask_mouse(0x10, enable)  # BIT4
+
+    async def mask_x(self, enable: bool) -> bool:
+        """Mask/unmask X axis movement"""
+        return await self._mask_mouse(0x20, enable)  # BIT5
+
+    async def mask_y(self, enable: bool) -> bool:
+        """Mask/unmask Y axis movement"""
+        return await self._mask_mouse(0x40, enable)  # BIT6
+
+    async def mask_wheel(self, enable: bool) -> bool:
+        """Mask/unmask mouse wheel"""
+        return await self._mask_mouse(0x80, enable)  # BIT7
+
+    async def mask_keyboard(self, vkey: int) -> bool:
+        """Mask specific keyboard key"""
+        v_key = vkey & 0xFF
+        rand_value = (self.mask_flag & 0xFF) | (v_key << 8)
+        result, _ = await self.send_cmd(CMD_MASK_MOUSE, rand_override=rand_value)
+        return result
+
+    async def unmask_keyboard(self, vkey: int) -> bool:
+        """Unmask specific keyboard key"""
+        v_key = vkey & 0xFF
+        rand_value = (self.mask_flag & 0xFF) | (v_key << 8)
+        result, _ = await self.send_cmd(CMD_UNMASK_ALL, rand_override=rand_value)
+        return result
+
+    async def unmask_all(self) -> bool:
+        """Unmask all previously masked inputs"""
+        self.mask_flag = 0
+        result, _ = await self.send_cmd(CMD_UNMASK_ALL, rand_override=self.mask_flag)
+        return result
+
+    async def set_config(self, ip: str, port: int) -> bool:
+        """Set device IP configuration"""
+        ip_int = int(ipaddress.IPv4Address(ip))
+        payload = struct.pack(">H", port)
+        result, _ = await self.send_cmd(CMD_SETCONFIG, payload, rand_override=ip_int)
+        return result
+
+    async def reboot(self) -> bool:
+        """Reboot the kmbox device and disconnect"""
+        try:
+            result, _ = await self.send_cmd(CMD_REBOOT)
+            self.lcd_shadow.invalidate()
+            self.close()
+            return result
+        except Exception:
+            return False
+
+    async def debug(self, port: int, enable: bool) -> bool:
+        """Enable/disable debug output to specified port"""
+        rand_value = port | (int(enable) << 16)
+        result, _ = await self.send_cmd(CMD_DEBUG, rand_override=rand_value)
+        return result
+
+    async def _show_stripes(self, stripes: list[tuple[int, bytes]]) -> bool:
+        """
+        Send (stripe index, payload) CMD_SHOWPIC stripes with up to
+        `lcd_window` in flight, independent of `window`, record acknowledged
+        ones in lcd_shadow and the outcome of the frame in last_lcd_upload.
+
+        A stripe whose answer is overdue by the adaptive RTO is resent on its
+        own, up to `lcd_retries` times; after a stripe failed no new ones are
+        sent.
+        """
+        shadow = self.lcd_shadow
+        window = asyncio.Semaphore(self.lcd_window)
+        failed = False
+        retransmits = 0
+
+        async def send(index: int, row_data: bytes) -> bool:
+            nonlocal failed, retransmits
+            async with window:
+                if failed:
+                    return False
+                # unknown until acknowledged
+                shadow.acknowledge(index, None)
+                result, _, attempts = await self._request(
+                    CMD_SHOWPIC,
+                    row_data,
+                    rand_override=index * STRIPE_ROWS,
+                    retries=self.lcd_retries,
+                )
+            retransmits += attempts
+            if result:
+                shadow.acknowledge(index, row_data)
+            else:
+                failed = True
+            return result
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *[send(index, row_data) for index, row_data in stripes]
+        )
+        ok = all(results)
+        self.last_lcd_upload = LcdUpload(
+            stripes=len(stripes),
+            retransmits=retransmits,
+            latency=time.perf_counter() - start,
+            ok=ok,
+        )
+        return ok
+
+    async def lcd_color(self, rgb565: int, full_refresh: bool = False) -> bool:
+        """Fill LCD screen with specified color"""
+        color_data = struct.pack("<512H", *([rgb565] * 512))
+        return await self._show_stripes(
+            self.lcd_shadow.changed(color_data * STRIPES, 0, full_refresh)
+        )
+
+    async def lcd_picture_bottom(
+        self, image_data: bytes, full_refresh: bool = False
+    ) -> bool:
+        """
+        Display 128x80 picture on bottom of LCD.
+
+        Only the stripes that differ from the last acknowledged frame are
+        sent; full_refresh sends all of them.
+        """
+        if len(image_data) != FRAME_SIZE // 2:  # 128x80x2bytes
+            raise ValueError("Image data must be 128x80x2 bytes (RGB565)")
+
+        return await self._show_stripes(
+            self.lcd_shadow.changed(image_data, STRIPES // 2, full_refresh)
+        )
+
+    async def lcd_picture(self, image_data: bytes, full_refresh: bool = False) -> bool:
+        """
+        Display 128x160 picture on full LCD.
+
+        Only the stripes that differ from the last acknowledged frame are
+        sent; full_refresh sends all of them.
+        """
+        if len(image_data) != FRAME_SIZE:
+            raise ValueError("Image data must be 128x160x2 bytes (RGB565)")
+
+        return await self._show_stripes(
+            self.lcd_shadow.changed(image_data, 0, full_refresh)
+        )
+
+    async def set_vid_pid(self, vid: int, pid: int) -> bool:
+        """Set USB Vendor ID and Product ID"""
+        payload = struct.pack("<HH", vid, pid)
+        result, _ = await self.send_cmd(CMD_SETVIDPID, payload)
+        return result
+
+    async def trace_enable(self, enable: bool) -> bool:
+        """Enable/disable trace functionality"""
+        rand_value = 1 if enable else 0
+        result, _ = await self.send_cmd(CMD_TRACE_ENABLE, rand_override=rand_value)
+        return result
+
+    def close(self):
+        """Stop monitor and close the datagram transport"""
+        if self.monitor:
+            self.monitor.stop()
+            self.monitor = None
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    async def aclose(self):
+        """Release buttons, unmask all inputs and close"""
+        try:
+            await asyncio.gather(
+                self.left(False), self.right(False), self.middle(False)
+            )
+            await self.unmask_all()
+        finally:
+            self.close()
+
+    async def __aenter__(self) -> "AsyncKmboxNet":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
@@ -0,0 +1,225 @@
+import mmap
+import struct
+import threading
+import time
+from typing import Iterator, Optional, Union
+
+from .monitor import REPORT_SIZE, Monitor
+from .timing import sleep_until
+
+# file layout: header, then fixed 32 byte records appended until the end of
+# the file (record count = (file size - header) / 32), all little endian
+CAPTURE_MAGIC = b"KMBXCAP1"
+CAPTURE_HEADER = struct.Struct("<8sII")  # magic, version, record size
+CAPTURE_VERSION = 1
+# time stamp in ns + raw 20 byte report + padding
+CAPTURE_RECORD = struct.Struct("<q20s4x")
+_TIME_STAMP_NS = struct.Struct("<q")
+
+
+class KmboxCaptureError(Exception):
+    """Capture file related errors"""
+
+    pass
+
+
+class PacketCapture:
+    """
+    Appends every raw report a Monitor receives to a capture file.
+
+    Records are packed into an in-memory batch and written when it is full
+    (and on flush()/stop()), so the listener thread does not pay for a
+    write() per packet. A failed write (disk full, closed file, ...) stops
+    the capture and is kept in `error`; it never reaches the monitor.
+    """
+
+    def __init__(self, monitor: Monitor, path: str, batch: int = 256):
+        """
+        Args:
+            monitor (Monitor): Monitor to capture from
+            path (str): Capture file; appended to if it exists
+            batch (int, optional): Records buffered before each write. Defaults to 256.
+        """
+        self.monitor = monitor
+        self.path = path
+        self.count = 0
+        self._batch = bytearray(batch * CAPTURE_RECORD.size)
+        self._used = 0
+        self._lock = threading.Lock()
+        self._file = None
+        # first write error, after which nothing more is captured
+        self.error: Optional[Exception] = None
+
+    def start(self) -> "PacketCapture":
+        """Open the file and start capturing"""
+        self.error = None
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(
+                CAPTURE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, CAPTURE_RECORD.size)
+            )
+        self.monitor.add_tap(self._on_report)
+        return self
+
+    def stop(self):
+        """Stop capturing, write what is buffered and close the file"""
+        self.monitor.remove_tap(self._on_report)
+        self.flush()
+        with self._lock:
+            self._close()
+
+    def flush(self):
+        """Write buffered records to the file"""
+        with self._lock:
+            if self._file is not None and self._used:
+                self._write(memoryview(self._batch)[: self._used], True)
+            self._used = 0
+
+    def _write(self, data, flush: bool = False):
+        """Write data with the lock held; on error stop capturing"""
+        try:
+            self._file.write(data)
+            if flush:
+                self._file.flush()
+        except (OSError, ValueError) as e:
+            # ValueError: write to a closed file
+            print(f"Warning:capture stopped: {e}")
+            self.error = e
+            self.monitor.remove_tap(self._on_report)
+            self._close()
+
+    def _close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except (OSError, ValueError):
+                pass
+            self._file = None
+
+    def __enter__(self) -> "PacketCapture":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _on_report(self, report, time_stamp: float):
+        with self._lock:
+            offset = self._used
+            _TIME_STAMP_NS.pack_into(self._batch, offset, round(time_stamp * 1e9))
+            self._batch[offset + 8 : offset + 8 + REPORT_SIZE] = report
+            self._used = offset + CAPTURE_RECORD.size
+            self.count += 1
+            if self._used == len(self._batch):
+                if self._file is not None:
+                    self._write(self._batch)
+                self._used = 0
+
+
+class CaptureFile:
+    """Memory-mapped, read-only view of a capture file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < CAPTURE_HEADER.size:
+            self._mmap.close()
+            raise KmboxCaptureError(f"Capture file too short: {path}")
+        magic, version, record_size = CAPTURE_HEADER.unpack_from(self._mmap)
+        if magic != CAPTURE_MAGIC or record_size != CAPTURE_RECORD.size:
+            self._mmap.close()
+            raise KmboxCaptureError(f"Invalid capture file: {path}")
+        self.version = version
+        # a partially written last record is ignored
+        self._count = (len(self._mmap) - CAPTURE_HEADER.size) // CAPTURE_RECORD.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def time_stamp_ns(self, index: int) -> int:
+        offset = CAPTURE_HEADER.size + index * CAPTURE_RECORD.size
+        return _TIME_STAMP_NS.unpack_from(self._mmap, offset)[0]
+
+    def report(self, index: int) -> bytes:
+        """Raw 20 byte report"""
+        offset = CAPTURE_HEADER.size + index * CAPTURE_RECORD.size + 8
+        return self._mmap[offset : offset + REPORT_SIZE]
+
+    def __iter__(self) -> Iterator[tuple[int, bytes]]:
+        """Yield (time stamp in ns, raw report) for every record"""
+        buffer = self._mmap
+        unpack_from = _TIME_STAMP_NS.unpack_from
+        offset = CAPTURE_HEADER.size
+        for _ in range(self._count):
+            yield unpack_from(buffer, offset)[0], buffer[offset + 8 : offset + 28]
+            offset += CAPTURE_RECORD.size
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self) -> "CaptureFile":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def replay_capture(
+    monitor: Monitor,
+    capture: Union[str, CaptureFile],
+    speed: Optional[float] = 1.0,
+    original_time_stamps: bool = False,
+) -> int:
+    """
+    Feed a capture through monitor's ingest path as if it came off the wire.
+
+    Events, snapshots, subscriptions, taps and take_motion() all see the
+    replayed reports. The monitor does not need to be started. Neutral
+    events are emitted wherever the recorded gap exceeds monitor_timeout.
+
+    Args:
+        monitor (Monitor): Monitor to feed
+        capture (str|CaptureFile): Capture file path or opened capture
+        speed (float|None, optional): Playback speed multiplier. None replays as fast as possible. Defaults to 1.0.
+        original_time_stamps (bool, optional): Stamp events with the captured times instead of replay times. Defaults to False.
+
+    Returns:
+        int: Number of reports replayed
+    """
+    opened = isinstance(capture, str)
+    if opened:
+        capture = CaptureFile(capture)
+    try:
+        perf_counter = time.perf_counter
+        timeout_ns = (
+            None
+            if monitor.monitor_timeout is None
+            else round(monitor.monitor_timeout * 1e9)
+        )
+        first_ns = None
+        previous_ns = 0
+        start = perf_counter()
+        count = 0
+        for ns, report in capture:
+            if first_ns is None:
+                first_ns = ns
+            elif timeout_ns is not None and ns - previous_ns > timeout_ns:
+                # where the live listener would have fired, on the same clock
+                # as the reports around it
+                neutral_ns = previous_ns + timeout_ns
+                if speed:
+                    sleep_until(start + (neutral_ns - first_ns) / 1e9 / speed)
+                monitor._emit_neutral(
+                    neutral_ns / 1e9 if original_time_stamps else perf_counter()
+                )
+            if speed:
+                sleep_until(start + (ns - first_ns) / 1e9 / speed)
+            monitor._ingest(
+                report, ns / 1e9 if original_time_stamps else perf_counter()
+            )
+            previous_ns = ns
+            count += 1
+        return count
+    finally:
+        if opened:
+            capture.close()
@@ -0,0 +1,199 @@
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from .kmbox import KmboxNet
+
+# Per packet limits of the HID mouse report; larger sums are carried over
+MAX_XY = 32767
+MAX_WHEEL = 127
+
+
+def _clamp(value: int, limit: int) -> int:
+    return -limit if value < -limit else limit if value > limit else value
+
+
+class MotionCoalescer:
+    """
+    Accumulates relative motion and button changes in front of KmboxNet.
+
+    Deltas are summed and sent as a single CMD_MOUSE_MOVE (motion only) or
+    mouse_all packet (buttons or wheel involved) per flush. Flushes happen at
+    a fixed rate, or, with rate_hz=None, as soon as the previous command is
+    answered. Motion is never dropped: amounts above the per-packet report
+    limits are carried to the next flush, and a flush with nothing pending
+    sends nothing.
+    """
+
+    def __init__(self, kmbox: KmboxNet, rate_hz: Optional[float] = 1000.0):
+        """
+        Args:
+            kmbox (KmboxNet): Connected device
+            rate_hz (float|None, optional): Flush rate. None flushes whenever a command slot is free. Defaults to 1000.0.
+        """
+        self.kmbox = kmbox
+        self.rate_hz = rate_hz
+
+        self._x = 0
+        self._y = 0
+        self._wheel = 0
+        self._buttons = kmbox._soft_mouse.button
+        # button states not sent yet, so a click inside one tick is not lost
+        self._button_states: deque[int] = deque()
+        self._cond = threading.Condition()
+        # held from taking the pending state until the packet is answered, so
+        # manual flush() calls and the flush thread send in order
+        self._send_lock = threading.Lock()
+
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+
+        # number of input calls and packets actually sent
+        self.inputs = 0
+        self.packets = 0
+
+    def move(self, x: int, y: int):
+        """Add relative motion"""
+        with self._cond:
+            self._x += x
+            self._y += y
+            self.inputs += 1
+            self._cond.notify()
+
+    def wheel(self, wheel_value: int):
+        """Add wheel motion"""
+        with self._cond:
+            self._wheel += wheel_value
+            self.inputs += 1
+            self._cond.notify()
+
+    def button(self, mask: int, is_down: bool):
+        """Press or release button bits (0x01 left, 0x02 right, 0x04 middle, ...)"""
+        with self._cond:
+            last = self._button_states[-1] if self._button_states else self._buttons
+            state = last | mask if is_down else last & ~mask
+            if state != last:
+                self._button_states.append(state)
+            self.inputs += 1
+            self._cond.notify()
+
+    def left(self, is_down: bool):
+        self.button(0x01, is_down)
+
+    def right(self, is_down: bool):
+        self.button(0x02, is_down)
+
+    def middle(self, is_down: bool):
+        self.button(0x04, is_down)
+
+    @property
+    def pending(self) -> bool:
+        """True if there is motion or a button change waiting to be sent"""
+        return bool(self._x or self._y or self._wheel or self._button_states)
+
+    def flush(self) -> bool:
+        """
+        Send what has been accumulated so far as one packet.
+
+        A packet that is not acknowledged is put back into the pending state,
+        so the next flush sends it again.
+
+        Returns:
+            bool: True if nothing was pending or the packet was acknowledged
+        """
+        with self._send_lock:
+            with self._cond:
+                if not self.pending:
+                    return True
+                x = _clamp(self._x, MAX_XY)
+                y = _clamp(self._y, MAX_XY)
+                wheel = _clamp(self._wheel, MAX_WHEEL)
+                self._x -= x
+                self._y -= y
+                self._wheel -= wheel
+                previous_buttons = self._buttons
+                buttons_changed = bool(self._button_states)
+                if buttons_changed:
+                    self._buttons = self._button_states.popleft()
+                buttons = self._buttons
+
+            self.packets += 1
+            try:
+                if buttons_changed or wheel:
+                    result = self.kmbox.mouse_all(buttons, x, y, wheel)
+                else:
+                    result = self.kmbox.move(x, y)
+            except Exception as e:
+                print(f"Warning:{e}")
+                result = False
+
+            if not result:
+                with self._cond:
+                    self._x += x
+                    self._y += y
+                    self._wheel += wheel
+                    if buttons_changed:
+                        self._button_states.appendleft(buttons)
+                        self._buttons = previous_buttons
+            return result
+
+    def start(self) -> "MotionCoalescer":
+        """Start the background flush thread"""
+        if self.running:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop the flush thread and send whatever is still pending"""
+        self.running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+        # stops early if the device does not answer, instead of retrying forever
+        while self.pending and self.flush():
+            pass
+
+    def __enter__(self) -> "MotionCoalescer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _flush_loop(self):
+        try:
+            if self.rate_hz:
+                self._fixed_rate_loop(1.0 / self.rate_hz)
+            else:
+                self._slot_loop()
+        except Exception as e:
+            print(f"Coalescer loop error: {e}")
+        finally:
+            # allow start() to run a new thread
+            self.running = False
+
+    def _fixed_rate_loop(self, period: float):
+        next_tick = time.perf_counter()
+        while self.running:
+            next_tick += period
+            now = time.perf_counter()
+            if next_tick > now:
+                time.sleep(next_tick - now)
+            else:
+                # fell behind; skip missed ticks instead of bursting
+                next_tick = now
+            if self.pending:
+                self.flush()
+
+    def _slot_loop(self):
+        # each flush blocks until the device answered, which frees the slot
+        while self.running:
+            with self._cond:
+                while self.running and not self.pending:
+                    self._cond.wait()
+            if self.running:
+                self.flush()
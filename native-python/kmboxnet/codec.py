@@ -0,0 +1,53 @@
+import random
+import struct
+
+# Precompiled layouts of the kmbox net protocol
+# header: mac(4) + rand(4) + index(4) + cmd(4)
+HEADER = struct.Struct("<IIII")
+# soft mouse: button + x + y + wheel, followed by point[10]
+MOUSE_HEAD = struct.Struct("<4i")
+MOUSE_POINT = struct.Struct("<10i")
+# soft keyboard: ctrl + reserved + button[10]
+KEYBOARD = struct.Struct("<BB10B")
+
+# monitor report: mouse(report_id, buttons, x, y, wheel) + keyboard(report_id, buttons, data[10])
+MONITOR_REPORT = struct.Struct("<BBhhhBB10B")
+
+MOUSE_SIZE = MOUSE_HEAD.size + MOUSE_POINT.size
+KEYBOARD_SIZE = KEYBOARD.size
+
+# C implemented, far cheaper than random.randint(0, 0x7FFFFFFF)
+_getrandbits = random.getrandbits
+
+
+def nonce() -> int:
+    """Random value for the header rand field (0 to 0x7FFFFFFF)"""
+    return _getrandbits(31)
+
+
+class CommandEncoder:
+    """
+    Encodes the fixed CMD_* layouts into reusable buffers.
+
+    The returned bytearray is overwritten by the next call of the same
+    layout, so it must be sent before encoding the next command.
+    """
+
+    def __init__(self, mac: int):
+        self.mac = mac
+        self._mouse = bytearray(HEADER.size + MOUSE_SIZE)
+        self._keyboard = bytearray(HEADER.size + KEYBOARD_SIZE)
+
+    def mouse(self, index: int, cmd: int, rand: int, soft_mouse) -> bytearray:
+        """Header followed by SoftMouse payload"""
+        buffer = self._mouse
+        HEADER.pack_into(buffer, 0, self.mac, rand, index, cmd)
+        soft_mouse.pack_into(buffer, HEADER.size)
+        return buffer
+
+    def keyboard(self, index: int, cmd: int, rand: int, soft_keyboard) -> bytearray:
+        """Header followed by SoftKeyboard payload"""
+        buffer = self._keyboard
+        HEADER.pack_into(buffer, 0, self.mac, rand, index, cmd)
+        soft_keyboard.pack_into(buffer, HEADER.size)
+        return buffer
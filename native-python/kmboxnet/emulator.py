@@ -0,0 +1,333 @@
+import heapq
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .codec import HEADER, KEYBOARD, MONITOR_REPORT, MOUSE_HEAD
+from .kmbox import (
+    CMD_BEZIER_MOVE,
+    CMD_CONNECT,
+    CMD_KEYBOARD_ALL,
+    CMD_MASK_MOUSE,
+    CMD_MONITOR,
+    CMD_MOUSE_AUTOMOVE,
+    CMD_MOUSE_LEFT,
+    CMD_MOUSE_MIDDLE,
+    CMD_MOUSE_MOVE,
+    CMD_MOUSE_RIGHT,
+    CMD_MOUSE_WHEEL,
+    CMD_SHOWPIC,
+    CMD_UNMASK_ALL,
+)
+
+LCD_WIDTH = 128
+LCD_HEIGHT = 160
+
+
+@dataclass
+class EmulatorState:
+    """Device state as seen through the commands received so far"""
+
+    connected: bool = False
+    buttons: int = 0
+    x: int = 0
+    y: int = 0
+    wheel: int = 0
+    keyboard_ctrl: int = 0
+    keyboard_keys: list[int] = field(default_factory=lambda: [0] * 10)
+    mask_flag: int = 0
+    masked_keys: set[int] = field(default_factory=set)
+    framebuffer: bytearray = field(
+        default_factory=lambda: bytearray(LCD_WIDTH * LCD_HEIGHT * 2)
+    )
+    monitor_addr: Optional[tuple[str, int]] = None
+    commands: dict[int, int] = field(default_factory=dict)
+
+
+class KmboxEmulator:
+    """
+    Local UDP stand-in for a Kmbox Net device.
+
+    Speaks the same protocol as KmboxNet: every valid command is answered by
+    echoing its 16 byte header. Network impairments can be configured to
+    measure throughput and tail latency without real hardware.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        uuid: str = "11223344",
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        loss: float = 0.0,
+        reorder: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Create emulator. Call start() to begin serving.
+
+        Args:
+            host (str, optional): Bind address. Defaults to "127.0.0.1".
+            port (int, optional): Bind port. 0 picks a free port. Defaults to 0.
+            uuid (str, optional): Device UUID; commands for another mac are ignored. Defaults to "11223344".
+            latency (float, optional): Fixed response delay in seconds. Defaults to 0.0.
+            jitter (float, optional): Extra uniform random delay in seconds (0 to jitter). Defaults to 0.0.
+            loss (float, optional): Probability of dropping an incoming command. Defaults to 0.0.
+            reorder (float, optional): Probability of holding a response back so later ones overtake it. Defaults to 0.0.
+            seed (int|None, optional): Random seed for reproducible impairments. Defaults to None.
+        """
+        self.mac = int.from_bytes(bytes.fromhex(uuid), byteorder="big")
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.reorder = reorder
+        self._random = random.Random(seed)
+
+        self.state = EmulatorState()
+        self._lock = threading.Lock()
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.address: tuple[str, int] = self.sock.getsockname()
+
+        self.running = False
+        self._threads: list[threading.Thread] = []
+        self._queue: list[tuple[float, int, bytes, tuple[str, int]]] = []
+        self._queue_cond = threading.Condition()
+        self._seq = 0
+
+    @property
+    def port(self) -> int:
+        return self.address[1]
+
+    def start(self) -> "KmboxEmulator":
+        """Start serving in background threads"""
+        if self.running:
+            return self
+        self.running = True
+        self._threads = [
+            threading.Thread(target=self._serve_loop, daemon=True),
+            threading.Thread(target=self._delay_loop, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket"""
+        self.running = False
+        with self._queue_cond:
+            self._queue_cond.notify_all()
+        try:
+            self.sock.close()
+        except Exception:
+            pass
+        for thread in self._threads:
+            if thread.is_alive():
+                thread.join(timeout=2.0)
+
+    def __enter__(self) -> "KmboxEmulator":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _serve_loop(self):
+        buffer = bytearray(65535)
+        view = memoryview(buffer)
+        while self.running:
+            try:
+                nbytes, addr = self.sock.recvfrom_into(buffer)
+            except OSError:
+                break
+            if nbytes < HEADER.size:
+                continue
+            if self.loss and self._random.random() < self.loss:
+                continue
+            mac, rand, _index, cmd = HEADER.unpack_from(buffer)
+            if mac != self.mac:
+                continue
+
+            self._apply(cmd, rand, view[HEADER.size : nbytes], addr)
+            self._respond(view[: HEADER.size].tobytes(), addr)
+
+    def _apply(self, cmd: int, rand: int, payload: memoryview, addr):
+        with self._lock:
+            state = self.state
+            state.commands[cmd] = state.commands.get(cmd, 0) + 1
+
+            if cmd == CMD_CONNECT:
+                state.connected = True
+            elif cmd in (CMD_MOUSE_MOVE, CMD_MOUSE_AUTOMOVE, CMD_BEZIER_MOVE):
+                if len(payload) >= MOUSE_HEAD.size:
+                    button, x, y, _ = MOUSE_HEAD.unpack_from(payload)
+                    state.buttons = button
+                    state.x += x
+                    state.y += y
+            elif cmd in (CMD_MOUSE_LEFT, CMD_MOUSE_RIGHT, CMD_MOUSE_MIDDLE):
+                if len(payload) >= MOUSE_HEAD.size:
+                    state.buttons = MOUSE_HEAD.unpack_from(payload)[0]
+            elif cmd == CMD_MOUSE_WHEEL:
+                if len(payload) >= MOUSE_HEAD.size:
+                    button, x, y, wheel = MOUSE_HEAD.unpack_from(payload)
+                    state.buttons = button
+                    state.x += x
+                    state.y += y
+                    state.wheel += wheel
+            elif cmd == CMD_KEYBOARD_ALL:
+                if len(payload) >= KEYBOARD.size:
+                    ctrl, _, *keys = KEYBOARD.unpack_from(payload)
+                    state.keyboard_ctrl = ctrl
+                    state.keyboard_keys = keys
+            elif cmd == CMD_MASK_MOUSE:
+                state.mask_flag = rand & 0xFF
+                if (rand >> 8) & 0xFF:
+                    state.masked_keys.add((rand >> 8) & 0xFF)
+            elif cmd == CMD_UNMASK_ALL:
+                state.mask_flag = rand & 0xFF
+                if (rand >> 8) & 0xFF:
+                    state.masked_keys.discard((rand >> 8) & 0xFF)
+                elif rand == 0:
+                    state.masked_keys.clear()
+            elif cmd == CMD_SHOWPIC:
+                # rand is the first LCD row of this stripe
+                offset = rand * LCD_WIDTH * 2
+                end = min(offset + len(payload), len(state.framebuffer))
+                if offset < end:
+                    state.framebuffer[offset:end] = payload[: end - offset]
+            elif cmd == CMD_MONITOR:
+                if rand >> 16 == 0xAA55:
+                    state.monitor_addr = (addr[0], rand & 0xFFFF)
+                else:
+                    state.monitor_addr = None
+
+    def _respond(self, data: bytes, addr):
+        delay = self.latency
+        if self.jitter:
+            delay += self._random.random() * self.jitter
+        if self.reorder and self._random.random() < self.reorder:
+            delay += max(self.latency + self.jitter, 0.001)
+
+        if delay <= 0:
+            try:
+                self.sock.sendto(data, addr)
+            except OSError:
+                pass
+            return
+
+        with self._queue_cond:
+            self._seq += 1
+            heapq.heappush(
+                self._queue, (time.perf_counter() + delay, self._seq, data, addr)
+            )
+            self._queue_cond.notify()
+
+    def _delay_loop(self):
+        while self.running:
+            with self._queue_cond:
+                while self.running and not self._queue:
+                    self._queue_cond.wait()
+                if not self.running:
+                    break
+                due, _, data, addr = self._queue[0]
+                remaining = due - time.perf_counter()
+                if remaining > 0:
+                    self._queue_cond.wait(remaining)
+                    continue
+                heapq.heappop(self._queue)
+            try:
+                self.sock.sendto(data, addr)
+            except OSError:
+                pass
+
+    def send_report(
+        self,
+        buttons: int = 0,
+        x: int = 0,
+        y: int = 0,
+        wheel: int = 0,
+        keyboard_ctrl: int = 0,
+        keys: Optional[list[int]] = None,
+    ) -> bool:
+        """
+        Send one 20 byte monitor report to the port registered by CMD_MONITOR.
+
+        Returns:
+            bool: False if no monitor is registered
+        """
+        target = self.state.monitor_addr
+        if target is None:
+            return False
+        keys = (list(keys or []) + [0] * 10)[:10]
+        report = MONITOR_REPORT.pack(1, buttons, x, y, wheel, 1, keyboard_ctrl, *keys)
+        try:
+            self.sock.sendto(report, target)
+        except OSError:
+            return False
+        return True
+
+    def stream_reports(
+        self, count: int, rate_hz: Optional[float] = None, x: int = 1, y: int = 0
+    ) -> int:
+        """
+        Send `count` motion reports, paced at rate_hz or as fast as possible.
+
+        Returns:
+            int: Number of reports sent
+        """
+        target = self.state.monitor_addr
+        if target is None:
+            return 0
+        report = MONITOR_REPORT.pack(1, 0, x, y, 0, 1, 0, *([0] * 10))
+        interval = 1.0 / rate_hz if rate_hz else 0.0
+        next_time = time.perf_counter()
+        sent = 0
+        for _ in range(count):
+            if interval:
+                next_time += interval
+                while time.perf_counter() < next_time:
+                    pass
+            try:
+                self.sock.sendto(report, target)
+            except OSError:
+                break
+            sent += 1
+        return sent
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Kmbox Net device emulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3368)
+    parser.add_argument("--uuid", default="11223344")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--loss", type=float, default=0.0)
+    parser.add_argument("--reorder", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    emulator = KmboxEmulator(
+        host=args.host,
+        port=args.port,
+        uuid=args.uuid,
+        latency=args.latency,
+        jitter=args.jitter,
+        loss=args.loss,
+        reorder=args.reorder,
+        seed=args.seed,
+    ).start()
+    print(
+        f"Kmbox emulator listening on {emulator.address[0]}:{emulator.port}", flush=True
+    )
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        emulator.stop()
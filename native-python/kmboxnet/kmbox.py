@@ -1,12 +1,17 @@
 import socket
 import struct
-import random
+from collections import deque
 from dataclasses import dataclass, field
+import threading
 import time
+import weakref
 from typing import Optional
 import ipaddress
 
+from .codec import HEADER, KEYBOARD, MOUSE_HEAD, MOUSE_POINT, CommandEncoder, nonce
+from .lcd import FRAME_SIZE, STRIPE_ROWS, STRIPES, LcdShadow, LcdUpload
 from .monitor import Monitor
+from .stats import CommandStats, CommandStatsSnapshot
 
 # fmt: off
 CMD_CONNECT        = 0xAF3C2828
@@ -29,6 +34,33 @@ CMD_SHOWPIC        = 0x12334883
 CMD_TRACE_ENABLE   = 0xBBCDDDAC
 # fmt: on
 
+COMMAND_NAMES = {
+    value: name[4:].lower()
+    for name, value in globals().items()
+    if name.startswith("CMD_")
+}
+
+# commands that set absolute state, so applying a retransmitted duplicate is
+# harmless; relative motion (move, wheel, automove, bezier) and reboot are
+# never resent
+IDEMPOTENT_COMMANDS = frozenset(
+    {
+        CMD_CONNECT,
+        CMD_MOUSE_LEFT,
+        CMD_MOUSE_MIDDLE,
+        CMD_MOUSE_RIGHT,
+        CMD_KEYBOARD_ALL,
+        CMD_MONITOR,
+        CMD_DEBUG,
+        CMD_MASK_MOUSE,
+        CMD_UNMASK_ALL,
+        CMD_SETCONFIG,
+        CMD_SETVIDPID,
+        CMD_SHOWPIC,
+        CMD_TRACE_ENABLE,
+    }
+)
+
 
 @dataclass
 class SoftMouse:
@@ -37,17 +69,40 @@ class SoftMouse:
     y: int = 0
     wheel: int = 0
     point: list[int] = field(default_factory=lambda: [0] * 10)
+    # packed form of `point`, which is all zeros except after move_bezier
+    _point_key: list[int] = field(
+        default_factory=lambda: [0] * 10, init=False, repr=False, compare=False
+    )
+    _point_bytes: bytes = field(
+        default=bytes(MOUSE_POINT.size), init=False, repr=False, compare=False
+    )
 
     def to_payload(self) -> bytes:
         """Convert to struct payload"""
         return struct.pack("<14i", self.button, self.x, self.y, self.wheel, *self.point)
 
+    def pack_into(self, buffer: bytearray, offset: int = 0):
+        """Write struct payload into buffer at offset"""
+        MOUSE_HEAD.pack_into(buffer, offset, self.button, self.x, self.y, self.wheel)
+        if self.point != self._point_key:
+            self._point_key = self.point.copy()
+            self._point_bytes = MOUSE_POINT.pack(*self.point)
+        offset += MOUSE_HEAD.size
+        buffer[offset : offset + MOUSE_POINT.size] = self._point_bytes
+
     def reset_movement(self):
         """Reset relative movement values"""
         self.x = 0
         self.y = 0
         self.wheel = 0
 
+    def set_button(self, mask: int, is_down: bool):
+        """Set or clear button bits"""
+        if is_down:
+            self.button |= mask
+        else:
+            self.button &= ~mask
+
 
 @dataclass
 class SoftKeyboard:
@@ -59,6 +114,179 @@ class SoftKeyboard:
         """Convert to struct payload"""
         return struct.pack("<BB10B", self.ctrl, self.reserved, *self.button)
 
+    def pack_into(self, buffer: bytearray, offset: int = 0):
+        """Write struct payload into buffer at offset"""
+        KEYBOARD.pack_into(buffer, offset, self.ctrl, self.reserved, *self.button)
+
+    def press(self, vk_key: int):
+        """Add key to the pressed state"""
+        if 0xE0 <= vk_key <= 0xE7:
+            bit_pos = vk_key - 0xE0  # 0xE0→0, 0xE1→1, ..., 0xE7→7
+            self.ctrl |= 1 << bit_pos
+        else:
+            for i in range(10):
+                if self.button[i] == vk_key:
+                    break
+                if self.button[i] == 0:
+                    self.button[i] = vk_key
+                    break
+            else:
+                self.button[:-1] = self.button[1:]
+                self.button[9] = vk_key
+
+    def release(self, vk_key: int):
+        """Remove key from the pressed state"""
+        if 0xE0 <= vk_key <= 0xE7:
+            bit_pos = vk_key - 0xE0
+            self.ctrl &= ~(1 << bit_pos)
+        else:
+            for i in range(10):
+                if self.button[i] == vk_key:
+                    self.button[i:-1] = self.button[i + 1 :]
+                    self.button[9] = 0
+                    break
+
+
+@dataclass
+class LossStats:
+    """Delivery statistics of unacknowledged (fire-and-forget) commands"""
+
+    sent: int = 0
+    acked: int = 0
+    lost: int = 0
+    in_flight: int = 0
+    lost_indexes: list[int] = field(default_factory=list)
+
+    @property
+    def loss_rate(self) -> float:
+        """Lost / (acked + lost). 0.0 before anything is settled"""
+        settled = self.acked + self.lost
+        return self.lost / settled if settled else 0.0
+
+
+def _mac_from_uuid(uuid: str) -> int:
+    try:
+        mac_bytes = bytes.fromhex(uuid)
+        if len(mac_bytes) != 4:
+            raise ValueError
+        return int.from_bytes(mac_bytes, byteorder="big")
+    except ValueError:
+        raise KmboxError("UUID is 8 degits.")
+
+
+class RttEstimator:
+    """Smoothed RTT and RTT variance (RFC 6298) giving the retransmission timeout"""
+
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    K = 4
+
+    def __init__(
+        self, initial_rto: float = 0.25, min_rto: float = 0.02, max_rto: float = 2.0
+    ):
+        self.srtt: float | None = None
+        self.rttvar = 0.0
+        self.rto = initial_rto
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+
+    def update(self, rtt: float):
+        """Feed one RTT sample (never from a retransmitted command)"""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar += self.BETA * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += self.ALPHA * (rtt - self.srtt)
+        rto = self.srtt + self.K * self.rttvar
+        self.rto = min(max(rto, self.min_rto), self.max_rto)
+
+    def backoff(self, expired: float) -> float:
+        """
+        Double an expired timeout and keep it until the next valid sample
+        (RFC 6298 5.5). Commands that expired together double it only once.
+
+        Args:
+            expired (float): RTO that just expired
+
+        Returns:
+            float: RTO for the retransmission
+        """
+        self.rto = max(self.rto, min(expired * 2, self.max_rto))
+        return self.rto
+
+
+class CommandHandle:
+    """Completion handle of a command sent with KmboxNet.submit"""
+
+    __slots__ = (
+        "cmd",
+        "index",
+        "sent_at",
+        "done",
+        "ok",
+        "data",
+        "keep_data",
+        "packet",
+        "deadline",
+        "retry_at",
+        "rto",
+        "attempts",
+        "retries",
+        "_owner",
+    )
+
+    def __init__(
+        self,
+        owner: "KmboxNet",
+        cmd: int,
+        index: int,
+        sent_at: float = 0.0,
+        keep_data: bool = True,
+    ):
+        self.cmd = cmd
+        self.index = index
+        self.sent_at = sent_at
+        self.done = False
+        self.ok = False
+        self.data = b""
+        self.keep_data = keep_data
+        # retransmission state, set when sent
+        self.packet = b""
+        self.deadline = 0.0
+        self.retry_at = 0.0
+        self.rto = 0.0
+        self.attempts = 0
+        self.retries = 0
+        # weak, so in-flight handles do not keep the client (and __del__) alive
+        self._owner = weakref.ref(owner)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the device response of this command.
+
+        Args:
+            timeout (float|None, optional): Max seconds to wait. None waits until
+                the command itself times out (KmboxNet.TIMEOUT after sending).
+
+        Returns:
+            bool: True if the command was acknowledged
+        """
+        owner = self._owner()
+        if not self.done and owner is not None:
+            owner._wait_for(self, timeout)
+        return self.ok
+
+    def result(self, timeout: Optional[float] = None) -> tuple[bool, bytes]:
+        """Wait and return (Success status, Response data) like send_cmd"""
+        self.wait(timeout)
+        return self.ok, self.data
+
+    @property
+    def failed(self) -> bool:
+        """True if the command completed without a valid response"""
+        return self.done and not self.ok
+
 
 class KmboxNet:
     TIMEOUT = 2.0
@@ -70,6 +298,13 @@ class KmboxNet:
         uuid: str,
         monitor_port: int | None = 5002,
         monitor_timeout: Optional[float] = 0.003,
+        window: int = 1,
+        unacked_motion: bool = False,
+        stats: bool = False,
+        retries: int = 0,
+        monitor_options: Optional[dict] = None,
+        lcd_window: int = 8,
+        lcd_retries: int = 3,
     ):
         """
         Initialize KmboxNet connection.
@@ -80,24 +315,56 @@ class KmboxNet:
             uuid (str): Your Kmbox device UUID (8 digit hexadecimal)
             monitor_port (int|None, optional): Monitor port number. None to disable. Defaults to 5002.
             monitor_timeout (float, optional): Monitor timeout in seconds. Defaults to 0.003.
+            window (int, optional): Max commands in flight at once. 1 is stop-and-wait. Defaults to 1.
+            unacked_motion (bool, optional): Send move/wheel without waiting for the ack. Defaults to False.
+            stats (bool, optional): Collect per-command counters and RTT histograms. Defaults to False.
+            retries (int, optional): Retransmits of an unanswered idempotent command (IDEMPOTENT_COMMANDS), paced by the adaptive RTO. Defaults to 0.
+            monitor_options (dict|None, optional): Other Monitor arguments (bind_address, rcvbuf, reuse_port, kernel_timestamps, ...). Defaults to None.
+            lcd_window (int, optional): Max LCD stripes in flight during a frame upload. Defaults to 8.
+            lcd_retries (int, optional): Retransmits of an unanswered LCD stripe. Defaults to 3.
 
         Raises:
             KmboxError: If UUID is invalid or connection fails
         """
         # mac address generation from uuid
-        try:
-            mac_bytes = bytes.fromhex(uuid)
-            if len(mac_bytes) != 4:
-                raise ValueError
-            self.mac = int.from_bytes(mac_bytes, byteorder="big")
-        except ValueError:
-            raise KmboxError("UUID is 8 degits.")
+        self.mac = _mac_from_uuid(uuid)
 
         self._index = 0
         self._soft_mouse = SoftMouse()
         self._soft_keyboard = SoftKeyboard()
+        # what the LCD shows, so unchanged stripes are not sent again
+        self.lcd_shadow = LcdShadow()
+        self.lcd_window = max(1, lcd_window)
+        self.lcd_retries = max(0, lcd_retries)
+        self.last_lcd_upload: LcdUpload | None = None
         self.mask_flag = 0
 
+        # in-flight commands keyed by header index
+        self.window = max(1, window)
+        self._pending: dict[int, CommandHandle] = {}
+        self._io_lock = threading.RLock()
+
+        # adaptive retransmission; with retries=0 a command simply waits TIMEOUT
+        self.retries = max(0, retries)
+        self.rtt = RttEstimator(max_rto=self.TIMEOUT)
+
+        # reusable buffers for the hot path
+        self._encoder = CommandEncoder(self.mac)
+        self._recv_buf = bytearray(2048)
+        self._recv_view = memoryview(self._recv_buf)
+        self._sync_handle = CommandHandle(self, 0, 0, keep_data=False)
+
+        # fire-and-forget commands: header index -> (command, send time)
+        self.unacked_motion = unacked_motion
+        self._unacked: dict[int, tuple[int, float]] = {}
+        self._loss = LossStats()
+        self._lost_indexes: deque[int] = deque(maxlen=1024)
+
+        # instrumentation, None when disabled
+        self._stats: CommandStats | None = (
+            CommandStats(COMMAND_NAMES) if stats else None
+        )
+
         # define sokect
         try:
             self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -119,7 +386,9 @@ class KmboxNet:
                 result, data = self.send_cmd(CMD_MONITOR, rand_override=rand_override)
 
                 if result:
-                    self.monitor = Monitor(monitor_port, monitor_timeout)
+                    self.monitor = Monitor(
+                        monitor_port, monitor_timeout, **(monitor_options or {})
+                    )
                     self.monitor.start()
                     time.sleep(0.01)
                 else:
@@ -131,11 +400,15 @@ class KmboxNet:
     def _make_header(self, cmd: int, rand_override: int | None = None) -> bytes:
         self._index += 1
         if rand_override is None:
-            rand_override = random.randint(0, 0x7FFFFFFF)
-        return struct.pack("<IIII", self.mac, rand_override, self._index, cmd)
+            rand_override = nonce()
+        return HEADER.pack(self.mac, rand_override, self._index, cmd)
 
     def send_cmd(
-        self, cmd: int, payload: bytes = b"", rand_override: int | None = None
+        self,
+        cmd: int,
+        payload: bytes = b"",
+        rand_override: int | None = None,
+        deadline: float | None = None,
     ) -> tuple[bool, bytes]:
         """
         Send directly command to Kmbox device.
@@ -144,37 +417,367 @@ class KmboxNet:
             cmd (int): Command ID to send
             payload (bytes, optional): Command payload data. Defaults to b''.
             rand_override (int | None, optional): Override random value. Defaults to None.
+            deadline (float | None, optional): Give up after this many seconds instead of TIMEOUT. Defaults to None.
 
         Returns:
             tuple[bool, bytes]: (Success status, Response data)
         """
-        self._sock.sendto(
-            self._make_header(cmd, rand_override) + payload, self._server_addr
-        )
+        return self.submit(cmd, payload, rand_override, deadline).result()
+
+    def submit(
+        self,
+        cmd: int,
+        payload: bytes = b"",
+        rand_override: int | None = None,
+        deadline: float | None = None,
+    ) -> CommandHandle:
+        """
+        Send command to Kmbox device without waiting for the response.
+
+        Up to `window` commands are kept in flight. When the window is full,
+        this waits until the oldest command is answered or times out.
 
+        Args:
+            cmd (int): Command ID to send
+            payload (bytes, optional): Command payload data. Defaults to b''.
+            rand_override (int | None, optional): Override random value. Defaults to None.
+            deadline (float | None, optional): Give up after this many seconds instead of TIMEOUT. Defaults to None.
+
+        Returns:
+            CommandHandle: Handle to wait for the response
+        """
+        with self._io_lock:
+            if HEADER.size + len(payload) > len(self._recv_buf):
+                self._recv_buf = bytearray(min(HEADER.size + len(payload), 65535))
+                self._recv_view = memoryview(self._recv_buf)
+
+            packet = self._make_header(cmd, rand_override) + payload
+            handle = CommandHandle(self, cmd, self._index)
+            self._send_tracked(handle, packet, deadline)
+            return handle
+
+    def _send_tracked(
+        self, handle: CommandHandle, packet, deadline: float | None = None
+    ) -> None:
+        """Send packet once a window slot is free and register handle"""
+        while len(self._pending) >= self.window:
+            self._wait_for(next(iter(self._pending.values())), None)
+        self._track(handle, packet, deadline)
+
+    def _track(
+        self,
+        handle: CommandHandle,
+        packet,
+        deadline: float | None = None,
+        retries: int | None = None,
+    ) -> None:
+        """Register handle and send packet now (retries overrides the client's)"""
+        now = time.perf_counter()
+        handle.sent_at = now
+        handle.packet = packet
+        handle.attempts = 0
+        if deadline is None:
+            deadline = self.TIMEOUT
+        handle.deadline = now + deadline
+        if handle.cmd not in IDEMPOTENT_COMMANDS:
+            handle.retries = 0
+        else:
+            handle.retries = self.retries if retries is None else retries
+        if handle.retries:
+            handle.rto = self.rtt.rto
+            handle.retry_at = now + handle.rto
+        else:
+            handle.retry_at = handle.deadline
+        self._pending[handle.index] = handle
+        try:
+            self._sock.sendto(packet, self._server_addr)
+        except Exception:
+            del self._pending[handle.index]
+            raise
+        if self._stats is not None:
+            self._stats.on_send(handle.cmd, len(packet))
+
+    def _transact(self, cmd: int, index: int, packet) -> bool:
+        """Send encoded packet and wait for its ack, without keeping response data"""
+        handle = self._sync_handle
+        handle.cmd = cmd
+        handle.index = index
+        handle.done = False
+        handle.ok = False
+        self._send_tracked(handle, packet)
+        self._wait_for(handle, None)
+        return handle.ok
+
+    def _send_mouse(
+        self, cmd: int, rand_override: int | None = None, unacked: bool = False
+    ) -> bool:
+        """Send current SoftMouse state as cmd"""
+        with self._io_lock:
+            self._index += 1
+            rand = nonce() if rand_override is None else rand_override
+            packet = self._encoder.mouse(self._index, cmd, rand, self._soft_mouse)
+            if unacked:
+                return self._post_packet(cmd, packet)
+            return self._transact(cmd, self._index, packet)
+
+    def _send_keyboard(self) -> bool:
+        """Send current SoftKeyboard state"""
+        with self._io_lock:
+            self._index += 1
+            packet = self._encoder.keyboard(
+                self._index, CMD_KEYBOARD_ALL, nonce(), self._soft_keyboard
+            )
+            return self._transact(CMD_KEYBOARD_ALL, self._index, packet)
+
+    def post(
+        self, cmd: int, payload: bytes = b"", rand_override: int | None = None
+    ) -> bool:
+        """
+        Send command to Kmbox device without tracking a response for the caller.
+
+        The ack is drained later (on the next send or wait) and only counted
+        in loss_stats(). Commands unanswered after TIMEOUT are counted as lost.
+
+        Args:
+            cmd (int): Command ID to send
+            payload (bytes, optional): Command payload data. Defaults to b''.
+            rand_override (int | None, optional): Override random value. Defaults to None.
+
+        Returns:
+            bool: True if the datagram was handed to the socket
+        """
+        with self._io_lock:
+            return self._post_packet(
+                cmd, self._make_header(cmd, rand_override) + payload
+            )
+
+    def _post_packet(self, cmd: int, packet) -> bool:
+        """Send packet of the current index without waiting for the ack"""
         try:
-            recv_bufsize = max(2048, 16 + len(payload))
-            recv_bufsize = min(recv_bufsize, 65535)
-            data, sender_addr = self._sock.recvfrom(recv_bufsize)
-            if len(data) < 16:
-                raise KmboxError("Invalid Response")
-            _, _, resp_index, resp_cmd = struct.unpack("<IIII", data[:16])
-            if (
-                resp_cmd != cmd
-                or resp_index != self._index
-                or sender_addr != self._server_addr
-            ):
-                raise KmboxError("Invalid Response")
-            return True, data
-        except socket.timeout:
-            print("Command Timeout, Kmbox net is not connected?")
-            return False, b""
-        except KmboxError as e:
-            print(f"Warning:{e}")
-            return False, b""
+            self._drain()
+            self._sock.sendto(packet, self._server_addr)
         except Exception as e:
             print(f"Error:{e}")
-            return False, b""
+            return False
+        self._unacked[self._index] = (cmd, time.perf_counter())
+        self._loss.sent += 1
+        if self._stats is not None:
+            self._stats.on_send(cmd, len(packet))
+        return True
+
+    def loss_stats(self, reset: bool = False) -> LossStats:
+        """
+        Delivery statistics of commands sent with post().
+
+        Args:
+            reset (bool, optional): Clear counters after reading. Defaults to False.
+
+        Returns:
+            LossStats: Snapshot of sent/acked/lost counters and recently lost indexes
+        """
+        with self._io_lock:
+            try:
+                self._drain()
+            except Exception:
+                pass
+            self._expire_unacked(time.perf_counter())
+            stats = LossStats(
+                sent=self._loss.sent,
+                acked=self._loss.acked,
+                lost=self._loss.lost,
+                in_flight=len(self._unacked),
+                lost_indexes=list(self._lost_indexes),
+            )
+            if reset:
+                self._loss = LossStats()
+                self._lost_indexes.clear()
+            return stats
+
+    def _drain(self) -> None:
+        """Consume every response already queued on the socket"""
+        while self._recv_response(0.0):
+            pass
+        self._expire_unacked(time.perf_counter())
+
+    def _expire_unacked(self, now: float) -> None:
+        limit = now - self.TIMEOUT
+        while self._unacked:
+            index, (cmd, sent_at) = next(iter(self._unacked.items()))
+            if sent_at > limit:
+                break
+            del self._unacked[index]
+            self._loss.lost += 1
+            self._lost_indexes.append(index)
+            if self._stats is not None:
+                self._stats.on_timeout(cmd)
+
+    def enable_stats(self, enable: bool = True):
+        """Turn per-command instrumentation on or off. Turning off discards counters."""
+        with self._io_lock:
+            if not enable:
+                self._stats = None
+            elif self._stats is None:
+                self._stats = CommandStats(COMMAND_NAMES)
+
+    def stats(self, reset: bool = False) -> dict[str, CommandStatsSnapshot]:
+        """
+        Snapshot of per-command counters and RTT histograms.
+
+        Args:
+            reset (bool, optional): Clear counters after reading. Defaults to False.
+
+        Returns:
+            dict[str, CommandStatsSnapshot]: Keyed by command name (e.g. "mouse_move"). Empty if stats are disabled.
+        """
+        with self._io_lock:
+            if self._stats is None:
+                return {}
+            snapshot = self._stats.snapshot()
+            if reset:
+                self._stats.reset()
+            return snapshot
+
+    def stats_openmetrics(self) -> str:
+        """Per-command counters and RTT histograms in OpenMetrics text format"""
+        with self._io_lock:
+            if self._stats is None:
+                return "# EOF\n"
+            return self._stats.to_openmetrics()
+
+    def flush(self) -> bool:
+        """
+        Wait for all in-flight commands.
+
+        Returns:
+            bool: True if every command was acknowledged
+        """
+        with self._io_lock:
+            handles = list(self._pending.values())
+        return all([handle.wait() for handle in handles])
+
+    def _wait_for(self, handle: CommandHandle, timeout: Optional[float]) -> None:
+        with self._io_lock:
+            limit = handle.deadline
+            if timeout is not None:
+                limit = min(limit, time.perf_counter() + timeout)
+
+            while not handle.done:
+                now = time.perf_counter()
+                if now >= handle.deadline:
+                    self._expire(handle)
+                    break
+                if now >= limit:
+                    break
+                wake = limit
+                if self.retries:
+                    wake = min(wake, self._retransmit_due(now))
+                    if handle.done:
+                        break
+                try:
+                    self._recv_response(max(wake - now, 0.0))
+                except Exception as e:
+                    print(f"Error:{e}")
+                    self._complete(handle, False, b"")
+
+    def _expire(self, handle: CommandHandle) -> None:
+        print("Command Timeout, Kmbox net is not connected?")
+        if self._stats is not None:
+            self._stats.on_timeout(handle.cmd)
+        self._complete(handle, False, b"")
+
+    def _service(self, now: float) -> float:
+        """
+        Expire overdue in-flight commands and resend due ones, for callers
+        that receive responses themselves (KmboxPool).
+
+        Returns:
+            float: Next time on the perf_counter clock something is due
+        """
+        with self._io_lock:
+            wake = float("inf")
+            for handle in list(self._pending.values()):
+                if now >= handle.deadline:
+                    self._expire(handle)
+                else:
+                    wake = min(wake, handle.deadline)
+            if self._pending:
+                wake = min(wake, self._retransmit_due(now))
+            return wake
+
+    def fileno(self) -> int:
+        """File descriptor of the command socket (for selectors)"""
+        return self._sock.fileno()
+
+    def _retransmit_due(self, now: float) -> float:
+        """Resend every in-flight command whose RTO expired; return next retry time"""
+        next_retry = float("inf")
+        for handle in list(self._pending.values()):
+            if handle.retry_at <= now and handle.attempts < handle.retries:
+                handle.attempts += 1
+                handle.rto = self.rtt.backoff(handle.rto)
+                handle.retry_at = min(now + handle.rto, handle.deadline)
+                try:
+                    self._sock.sendto(handle.packet, self._server_addr)
+                except Exception as e:
+                    print(f"Error:{e}")
+                    self._complete(handle, False, b"")
+                    continue
+                if self._stats is not None:
+                    self._stats.on_retransmit(handle.cmd, len(handle.packet))
+            elif handle.attempts >= handle.retries:
+                handle.retry_at = handle.deadline
+            next_retry = min(next_retry, handle.retry_at)
+        return next_retry
+
+    def _recv_response(self, timeout: float) -> bool:
+        """Receive one datagram and complete the command it answers"""
+        self._sock.settimeout(timeout)
+        try:
+            nbytes, sender_addr = self._sock.recvfrom_into(self._recv_buf)
+        except (socket.timeout, BlockingIOError):
+            return False
+
+        # stray datagrams and late answers of expired commands are ignored
+        stats = self._stats
+        if sender_addr != self._server_addr or nbytes < HEADER.size:
+            if stats is not None:
+                stats.stray += 1
+            return True
+        _, _, resp_index, resp_cmd = HEADER.unpack_from(self._recv_buf)
+        handle = self._pending.get(resp_index)
+        if handle is None:
+            unacked = self._unacked.pop(resp_index, None)
+            if unacked is not None:
+                self._loss.acked += 1
+                # measured when drained, so it includes the time until the next send
+                if stats is not None:
+                    cmd, sent_at = unacked
+                    stats.on_ack(cmd, time.perf_counter() - sent_at, nbytes)
+            elif stats is not None:
+                stats.stray += 1
+            return True
+        if resp_cmd != handle.cmd:
+            print(f"Warning:{KmboxError('Invalid Response')}")
+            if stats is not None:
+                stats.on_invalid(handle.cmd, nbytes)
+            self._complete(handle, False, b"")
+            return True
+        rtt = time.perf_counter() - handle.sent_at
+        if handle.attempts == 0:
+            # Karn: answers of retransmitted commands are ambiguous samples
+            self.rtt.update(rtt)
+        if stats is not None:
+            stats.on_ack(handle.cmd, rtt, nbytes)
+        data = self._recv_view[:nbytes].tobytes() if handle.keep_data else b""
+        self._complete(handle, True, data)
+        return True
+
+    def _complete(self, handle: CommandHandle, ok: bool, data: bytes) -> None:
+        self._pending.pop(handle.index, None)
+        handle.packet = b""
+        handle.ok = ok
+        handle.data = data
+        handle.done = True
 
     def move(self, x: int, y: int) -> bool:
         """
@@ -190,7 +793,7 @@ class KmboxNet:
         self._soft_mouse.x = x
         self._soft_mouse.y = y
 
-        result, _ = self.send_cmd(CMD_MOUSE_MOVE, self._soft_mouse.to_payload())
+        result = self._send_mouse(CMD_MOUSE_MOVE, unacked=self.unacked_motion)
 
         self._soft_mouse.reset_movement()
         return result
@@ -210,9 +813,7 @@ class KmboxNet:
         self._soft_mouse.x = x
         self._soft_mouse.y = y
 
-        result, _ = self.send_cmd(
-            CMD_MOUSE_AUTOMOVE, self._soft_mouse.to_payload(), rand_override=ms
-        )
+        result = self._send_mouse(CMD_MOUSE_AUTOMOVE, rand_override=ms)
 
         self._soft_mouse.reset_movement()
         return result
@@ -242,41 +843,30 @@ class KmboxNet:
         self._soft_mouse.point[2] = x2
         self._soft_mouse.point[3] = y2
 
-        result, _ = self.send_cmd(
-            CMD_BEZIER_MOVE, self._soft_mouse.to_payload(), rand_override=ms
-        )
+        result = self._send_mouse(CMD_BEZIER_MOVE, rand_override=ms)
 
         self._soft_mouse.reset_movement()
         return result
 
     def left(self, is_down: bool) -> bool:
         """Left mouse button"""
-        if is_down:
-            self._soft_mouse.button |= 0x01
-        else:
-            self._soft_mouse.button &= ~0x01
+        self._soft_mouse.set_button(0x01, is_down)
 
-        result, _ = self.send_cmd(CMD_MOUSE_LEFT, self._soft_mouse.to_payload())
+        result = self._send_mouse(CMD_MOUSE_LEFT)
         return result
 
     def right(self, is_down: bool) -> bool:
         """Right mouse button"""
-        if is_down:
-            self._soft_mouse.button |= 0x02
-        else:
-            self._soft_mouse.button &= ~0x02
+        self._soft_mouse.set_button(0x02, is_down)
 
-        result, _ = self.send_cmd(CMD_MOUSE_RIGHT, self._soft_mouse.to_payload())
+        result = self._send_mouse(CMD_MOUSE_RIGHT)
         return result
 
     def middle(self, is_down: bool) -> bool:
         """Middle mouse button"""
-        if is_down:
-            self._soft_mouse.button |= 0x04
-        else:
-            self._soft_mouse.button &= ~0x04
+        self._soft_mouse.set_button(0x04, is_down)
 
-        result, _ = self.send_cmd(CMD_MOUSE_MIDDLE, self._soft_mouse.to_payload())
+        result = self._send_mouse(CMD_MOUSE_MIDDLE)
         return result
 
     def wheel(self, wheel_value: int) -> bool:
@@ -290,27 +880,30 @@ class KmboxNet:
             bool: True if command sent successfully
         """
         self._soft_mouse.wheel = wheel_value
-        result, _ = self.send_cmd(CMD_MOUSE_WHEEL, self._soft_mouse.to_payload())
+        result = self._send_mouse(CMD_MOUSE_WHEEL, unacked=self.unacked_motion)
         self._soft_mouse.wheel = 0
         return result
 
     def key_down(self, vk_key: int) -> bool:
         """Press key down"""
-        if 0xE0 <= vk_key <= 0xE7:
-            bit_pos = vk_key - 0xE0  # 0xE0→0, 0xE1→1, ..., 0xE7→7
-            self._soft_keyboard.ctrl |= 1 << bit_pos
-        else:
-            for i in range(10):
-                if self._soft_keyboard.button[i] == vk_key:
-                    break
-                if self._soft_keyboard.button[i] == 0:
-                    self._soft_keyboard.button[i] = vk_key
-                    break
-            else:
-                self._soft_keyboard.button[:-1] = self._soft_keyboard.button[1:]
-                self._soft_keyboard.button[9] = vk_key
+        self._soft_keyboard.press(vk_key)
+        result = self._send_keyboard()
+        return result
+
+    def keyboard_all(self, ctrl: int, keys: list[int]) -> bool:
+        """
+        Set the whole keyboard state in one command.
+
+        Args:
+            ctrl (int): Modifier bits (0xE0 → bit0 ... 0xE7 → bit7)
+            keys (list[int]): Pressed keys, up to 10
 
-        result, _ = self.send_cmd(CMD_KEYBOARD_ALL, self._soft_keyboard.to_payload())
+        Returns:
+            bool: True if command sent successfully
+        """
+        self._soft_keyboard.ctrl = ctrl
+        self._soft_keyboard.button = (list(keys) + [0] * 10)[:10]
+        result = self._send_keyboard()
         return result
 
     def mouse_all(self, button: int, x: int, y: int, wheel: int) -> bool:
@@ -320,7 +913,7 @@ class KmboxNet:
         self._soft_mouse.y = y
         self._soft_mouse.wheel = wheel
 
-        result, _ = self.send_cmd(CMD_MOUSE_WHEEL, self._soft_mouse.to_payload())
+        result = self._send_mouse(CMD_MOUSE_WHEEL)
 
         self._soft_mouse.reset_movement()
         return result
@@ -399,19 +992,8 @@ class KmboxNet:
 
     def key_up(self, vk_key: int) -> bool:
         """Release key"""
-        if 0xE0 <= vk_key <= 0xE7:
-            bit_pos = vk_key - 0xE0
-            self._soft_keyboard.ctrl &= ~(1 << bit_pos)
-        else:
-            for i in range(10):
-                if self._soft_keyboard.button[i] == vk_key:
-                    self._soft_keyboard.button[i:-1] = self._soft_keyboard.button[
-                        i + 1 :
-                    ]
-                    self._soft_keyboard.button[9] = 0
-                    break
-
-        result, _ = self.send_cmd(CMD_KEYBOARD_ALL, self._soft_keyboard.to_payload())
+        self._soft_keyboard.release(vk_key)
+        result = self._send_keyboard()
         return result
 
     def mask_keyboard(self, vkey: int) -> bool:
@@ -445,6 +1027,7 @@ class KmboxNet:
         """Reboot the kmbox device and disconnect"""
         try:
             result, _ = self.send_cmd(CMD_REBOOT)
+            self.lcd_shadow.invalidate()
 
             self._sock.close()
 
@@ -461,56 +1044,111 @@ class KmboxNet:
         result, _ = self.send_cmd(CMD_DEBUG, rand_override=rand_value)
         return result
 
-    def lcd_color(self, rgb565: int) -> bool:
-        """Fill LCD screen with specified color"""
+    def _show_stripes(self, stripes: list[tuple[int, bytes]]) -> bool:
+        """
+        Upload (stripe index, payload) CMD_SHOWPIC stripes with up to
+        `lcd_window` of them in flight, independent of `window`.
+
+        A stripe whose answer is overdue by the adaptive RTO is resent on its
+        own, up to `lcd_retries` times; after a stripe failed no new ones are
+        started. Acknowledged stripes are recorded in lcd_shadow and the
+        outcome of the frame in last_lcd_upload.
+        """
+        shadow = self.lcd_shadow
+        handles: list[CommandHandle] = []
+        start = time.perf_counter()
         try:
-            for y in range(40):
-                color_data = struct.pack("<512H", *([rgb565] * 512))
-                rand_value = 0 | (y * 4)
-                result, _ = self.send_cmd(
-                    CMD_SHOWPIC, color_data, rand_override=rand_value
-                )
-                if not result:
-                    return False
-            return True
-        except Exception:
-            return False
+            with self._io_lock:
+                queued = iter(stripes)
+                in_flight: list[CommandHandle] = []
+                failed = False
+                while True:
+                    while not failed and len(in_flight) < self.lcd_window:
+                        stripe = next(queued, None)
+                        if stripe is None:
+                            break
+                        index, row_data = stripe
+                        # unknown until acknowledged
+                        shadow.acknowledge(index, None)
+                        packet = (
+                            self._make_header(CMD_SHOWPIC, index * STRIPE_ROWS)
+                            + row_data
+                        )
+                        handle = CommandHandle(
+                            self, CMD_SHOWPIC, self._index, keep_data=False
+                        )
+                        self._track(handle, packet, retries=self.lcd_retries)
+                        handles.append(handle)
+                        in_flight.append(handle)
+                    if not in_flight:
+                        break
+
+                    now = time.perf_counter()
+                    wake = self._service(now)
+                    if not any(handle.done for handle in in_flight):
+                        self._recv_response(max(wake - now, 0.0))
+                    waiting = [handle for handle in in_flight if not handle.done]
+                    if len(waiting) < len(in_flight):
+                        # the device works through the stripes one by one, so
+                        # like TCP restart the retransmission timers on progress
+                        now = time.perf_counter()
+                        for handle in waiting:
+                            if handle.attempts == 0:
+                                handle.retry_at = min(
+                                    max(handle.retry_at, now + handle.rto),
+                                    handle.deadline,
+                                )
+                    in_flight = waiting
+                    failed = failed or any(handle.failed for handle in handles)
+        except Exception as e:
+            print(f"Error:{e}")
+
+        ok = len(handles) == len(stripes)
+        for (index, row_data), handle in zip(stripes, handles):
+            if handle.ok:
+                shadow.acknowledge(index, row_data)
+            else:
+                ok = False
+        self.last_lcd_upload = LcdUpload(
+            stripes=len(stripes),
+            retransmits=sum(handle.attempts for handle in handles),
+            latency=time.perf_counter() - start,
+            ok=ok,
+        )
+        return ok
 
-    def lcd_picture_bottom(self, image_data: bytes) -> bool:
-        """Display 128x80 picture on bottom of LCD"""
-        if len(image_data) != 128 * 80 * 2:  # 128x80x2bytes
+    def lcd_color(self, rgb565: int, full_refresh: bool = False) -> bool:
+        """Fill LCD screen with specified color"""
+        color_data = struct.pack("<512H", *([rgb565] * 512))
+        return self._show_stripes(
+            self.lcd_shadow.changed(color_data * STRIPES, 0, full_refresh)
+        )
+
+    def lcd_picture_bottom(self, image_data: bytes, full_refresh: bool = False) -> bool:
+        """
+        Display 128x80 picture on bottom of LCD.
+
+        Only the stripes that differ from the last acknowledged frame are
+        sent; full_refresh sends all of them.
+        """
+        if len(image_data) != FRAME_SIZE // 2:  # 128x80x2bytes
             raise ValueError("Image data must be 128x80x2 bytes (RGB565)")
 
-        try:
-            for y in range(20):
-                row_data = image_data[y * 1024 : (y + 1) * 1024]
-                rand_value = 80 + (y * 4)
-                result, _ = self.send_cmd(
-                    CMD_SHOWPIC, row_data, rand_override=rand_value
-                )
-                if not result:
-                    return False
-            return True
-        except Exception:
-            return False
+        return self._show_stripes(
+            self.lcd_shadow.changed(image_data, STRIPES // 2, full_refresh)
+        )
+
+    def lcd_picture(self, image_data: bytes, full_refresh: bool = False) -> bool:
+        """
+        Display 128x160 picture on full LCD.
 
-    def lcd_picture(self, image_data: bytes) -> bool:
-        """Display 128x160 picture on full LCD"""
-        if len(image_data) != 128 * 160 * 2:
+        Only the stripes that differ from the last acknowledged frame are
+        sent; full_refresh sends all of them.
+        """
+        if len(image_data) != FRAME_SIZE:
             raise ValueError("Image data must be 128x160x2 bytes (RGB565)")
 
-        try:
-            for y in range(40):
-                row_data = image_data[y * 1024 : (y + 1) * 1024]
-                rand_value = y * 4
-                result, _ = self.send_cmd(
-                    CMD_SHOWPIC, row_data, rand_override=rand_value
-                )
-                if not result:
-                    return False
-            return True
-        except Exception:
-            return False
+        return self._show_stripes(self.lcd_shadow.changed(image_data, 0, full_refresh))
 
     def set_vid_pid(self, vid: int, pid: int) -> bool:
         """Set USB Vendor ID and Product ID"""
@@ -526,6 +1164,9 @@ class KmboxNet:
 
     def __del__(self):
         try:
+            if self._sock.fileno() == -1:
+                # already closed by reboot() or a failed KmboxPool.add
+                return
             self.left(False)
             self.right(False)
             self.middle(False)
@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+from typing import Optional
+
+LCD_WIDTH = 128
+LCD_HEIGHT = 160
+# one CMD_SHOWPIC payload: 4 rows of 128 RGB565 pixels
+STRIPE_SIZE = 1024
+STRIPE_ROWS = 4
+STRIPES = LCD_HEIGHT // STRIPE_ROWS
+FRAME_SIZE = LCD_WIDTH * LCD_HEIGHT * 2
+
+
+@dataclass
+class LcdUpload:
+    """Outcome of one LCD frame upload"""
+
+    stripes: int  # stripes that differed and were sent
+    retransmits: int
+    latency: float  # seconds from the first send to the last answer
+    ok: bool
+
+
+class LcdShadow:
+    """
+    Client-side copy of what the panel shows, one entry per stripe.
+
+    A stripe is only recorded once the device acknowledged it; unknown
+    stripes (never sent, failed, or after invalidate()) are always sent.
+    """
+
+    def __init__(self):
+        self._stripes: list[Optional[bytes]] = [None] * STRIPES
+
+    def changed(
+        self, image_data: bytes, first: int = 0, full_refresh: bool = False
+    ) -> list[tuple[int, bytes]]:
+        """
+        Stripes of image_data that differ from the panel.
+
+        Args:
+            image_data (bytes): RGB565 pixels covering whole stripes
+            first (int, optional): Stripe index image_data starts at. Defaults to 0.
+            full_refresh (bool, optional): Return every stripe. Defaults to False.
+
+        Returns:
+            list[tuple[int, bytes]]: (stripe index, 1024 byte payload) pairs
+        """
+        # one slice per stripe is needed for the payload anyway, and comparing
+        # bytes is a single memcmp (memoryview == compares element-wise)
+        image_data = bytes(image_data)
+        stripes = self._stripes
+        changed = []
+        for i in range(len(image_data) // STRIPE_SIZE):
+            data = image_data[i * STRIPE_SIZE : (i + 1) * STRIPE_SIZE]
+            if full_refresh or data != stripes[first + i]:
+                changed.append((first + i, data))
+        return changed
+
+    def acknowledge(self, index: int, data: Optional[bytes]):
+        """Record stripe data as shown on the panel (None: unknown)"""
+        self._stripes[index] = data
+
+    def invalidate(self):
+        """Forget the panel contents, so the next frame is sent in full"""
+        self._stripes = [None] * STRIPES
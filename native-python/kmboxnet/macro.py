@@ -0,0 +1,217 @@
+import mmap
+import struct
+import sys
+import time
+from array import array
+from typing import Iterator, Optional
+
+from .codec import MONITOR_REPORT
+from .kmbox import KmboxNet
+from .monitor import Event, HardKeyboard, HardMouse, Monitor
+from .timing import sleep_until
+
+# file layout: header, uint32 delta timestamps (us) [count], reports [count * 20]
+# all little endian
+MACRO_MAGIC = b"KMBXMAC1"
+MACRO_HEADER = struct.Struct("<8sII")  # magic, count, reserved
+REPORT_SIZE = MONITOR_REPORT.size
+MAX_DELTA_US = 0xFFFFFFFF
+
+
+class KmboxMacroError(Exception):
+    """Macro file related errors"""
+
+    pass
+
+
+class Macro:
+    """
+    Recorded monitor reports in two flat columns.
+
+    deltas holds the time since the previous report in microseconds, reports
+    the raw 20 byte monitor reports back to back. No Python object is kept
+    per event; Event objects are only built by event() / events().
+    """
+
+    def __init__(self):
+        self.deltas = array("I")
+        self.reports = bytearray()
+        self._mmap: Optional[mmap.mmap] = None
+
+    def __len__(self) -> int:
+        return len(self.deltas)
+
+    @property
+    def duration(self) -> float:
+        """Length of the recording in seconds"""
+        return sum(self.deltas) / 1e6
+
+    def append(self, report: bytes, delta_us: int):
+        """Append one 20 byte report received delta_us after the previous one"""
+        self.deltas.append(min(max(delta_us, 0), MAX_DELTA_US))
+        self.reports += report[:REPORT_SIZE]
+
+    def report(self, index: int) -> memoryview:
+        """Raw 20 byte report"""
+        offset = index * REPORT_SIZE
+        return memoryview(self.reports)[offset : offset + REPORT_SIZE]
+
+    def event(self, index: int, time_stamp: float = 0.0) -> Event:
+        """Materialize one report as an Event"""
+        report_id, buttons, x, y, wheel, k_report_id, k_buttons, *k_data = (
+            MONITOR_REPORT.unpack_from(self.reports, index * REPORT_SIZE)
+        )
+        return Event(
+            HardMouse(report_id, buttons, x, y, wheel, time_stamp),
+            HardKeyboard(k_report_id, k_buttons, k_data),
+        )
+
+    def events(self) -> Iterator[tuple[float, Event]]:
+        """Yield (offset in seconds, Event) for every report"""
+        elapsed = 0
+        for i, delta in enumerate(self.deltas):
+            elapsed += delta
+            yield elapsed / 1e6, self.event(i, elapsed / 1e6)
+
+    def save(self, path: str):
+        """Write the recording to path"""
+        deltas = self.deltas
+        if not isinstance(deltas, array) or sys.byteorder != "little":
+            deltas = array("I", deltas)
+            if sys.byteorder != "little":
+                deltas.byteswap()
+        with open(path, "wb") as f:
+            f.write(MACRO_HEADER.pack(MACRO_MAGIC, len(self), 0))
+            f.write(memoryview(deltas).cast("B"))
+            f.write(self.reports)
+
+    @classmethod
+    def load(cls, path: str, use_mmap: bool = True) -> "Macro":
+        """
+        Read a recording written by save().
+
+        Args:
+            path (str): File path
+            use_mmap (bool, optional): Map the file instead of reading it; columns then view the mapping. Defaults to True.
+
+        Returns:
+            Macro: Loaded recording. Call close() when done with a mapped one.
+        """
+        with open(path, "rb") as f:
+            if use_mmap:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buffer = f.read()
+
+        if len(buffer) < MACRO_HEADER.size:
+            raise KmboxMacroError(f"Macro file too short: {path}")
+        magic, count, _ = MACRO_HEADER.unpack_from(buffer)
+        deltas_end = MACRO_HEADER.size + count * 4
+        if magic != MACRO_MAGIC or len(buffer) < deltas_end + count * REPORT_SIZE:
+            raise KmboxMacroError(f"Invalid macro file: {path}")
+
+        macro = cls()
+        view = memoryview(buffer)
+        if sys.byteorder == "little":
+            macro.deltas = view[MACRO_HEADER.size : deltas_end].cast("I")
+        else:
+            macro.deltas = array("I", view[MACRO_HEADER.size : deltas_end].tobytes())
+            macro.deltas.byteswap()
+        macro.reports = view[deltas_end : deltas_end + count * REPORT_SIZE]
+        if use_mmap:
+            macro._mmap = buffer
+        return macro
+
+    def close(self):
+        """Release the file mapping of a loaded recording"""
+        if self._mmap is not None:
+            if isinstance(self.deltas, memoryview):
+                self.deltas.release()
+            self.reports.release()
+            self.deltas = array("I")
+            self.reports = bytearray()
+            self._mmap.close()
+            self._mmap = None
+
+    def play(
+        self,
+        kmbox: KmboxNet,
+        speed: float = 1.0,
+        mouse: bool = True,
+        keyboard: bool = True,
+    ) -> bool:
+        """
+        Replay the recording through kmbox with its original timing.
+
+        Relative motion is sent with move() (mouse_all() when buttons or the
+        wheel change), keyboard changes with keyboard_all().
+
+        Args:
+            kmbox (KmboxNet): Connected device
+            speed (float, optional): Playback speed multiplier. Defaults to 1.0.
+            mouse (bool, optional): Replay mouse reports. Defaults to True.
+            keyboard (bool, optional): Replay keyboard reports. Defaults to True.
+
+        Returns:
+            bool: True if every command was acknowledged
+        """
+        unpack_from = MONITOR_REPORT.unpack_from
+        reports = self.reports
+        scale = 1e-6 / speed
+        ok = True
+
+        buttons_state = 0
+        keyboard_state = (0, [0] * 10)
+        elapsed = 0
+        start = time.perf_counter()
+        for i, delta in enumerate(self.deltas):
+            elapsed += delta
+            sleep_until(start + elapsed * scale)
+            _, buttons, x, y, wheel, _, ctrl, *keys = unpack_from(
+                reports, i * REPORT_SIZE
+            )
+            if mouse:
+                if buttons != buttons_state or wheel:
+                    ok = kmbox.mouse_all(buttons, x, y, wheel) and ok
+                    buttons_state = buttons
+                elif x or y:
+                    ok = kmbox.move(x, y) and ok
+            if keyboard and (ctrl, keys) != keyboard_state:
+                ok = kmbox.keyboard_all(ctrl, keys) and ok
+                keyboard_state = (ctrl, keys)
+        return ok
+
+
+class MacroRecorder:
+    """Records the reports a Monitor receives into a Macro"""
+
+    def __init__(self, monitor: Monitor):
+        self.monitor = monitor
+        self.macro = Macro()
+        self._start = 0.0
+        self._last_us = 0
+
+    def start(self) -> "MacroRecorder":
+        """Start a new recording"""
+        self.macro = Macro()
+        self._start = time.perf_counter()
+        self._last_us = 0
+        self.monitor.add_tap(self._on_report)
+        return self
+
+    def stop(self) -> Macro:
+        """Stop recording and return the recording"""
+        self.monitor.remove_tap(self._on_report)
+        return self.macro
+
+    def __enter__(self) -> "MacroRecorder":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _on_report(self, report: bytes, time_stamp: float):
+        # quantize the absolute offset so rounding errors do not add up
+        now_us = round((time_stamp - self._start) * 1e6)
+        self.macro.append(report, now_us - self._last_us)
+        self._last_us = now_us
@@ -1,10 +1,52 @@
+import selectors
 import threading
 import socket
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Callable, Iterable, Optional, Sequence, Union
 import struct
 import queue
+import sys
 import time
+from array import array
+
+from .codec import MONITOR_REPORT
+from .subscriptions import (
+    BUTTON_DOWN,
+    BUTTON_UP,
+    EDGE_KINDS,
+    KEY_DOWN,
+    KEY_UP,
+    MOTION,
+    WHEEL,
+    AsyncSubscription,
+    InputEdge,
+    Subscription,
+    key_codes,
+    key_mask,
+)
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional
+    np = None
+
+REPORT_SIZE = MONITOR_REPORT.size
+# ring record: time_stamp(8) + raw report(20) + padding(4)
+RECORD = struct.Struct("<dBBhhhBB10B4x")
+_TIME_STAMP = struct.Struct("<d")
+_XY = struct.Struct("<hh")
+# published state: time_stamp(8) + sequence(8) + raw report(20)
+_PUBLISHED = struct.Struct("<dQ")
+_PUBLISHED_STATE = struct.Struct("<dQBBhhhBB10B")
+
+# kernel receive time stamps (Linux); the socket module does not export it
+SO_TIMESTAMPNS = getattr(
+    socket, "SO_TIMESTAMPNS", 35 if sys.platform.startswith("linux") else None
+)
+_TIMESPEC = struct.Struct("@ll")
+_ANCILLARY_SIZE = (
+    socket.CMSG_SPACE(_TIMESPEC.size) if hasattr(socket, "CMSG_SPACE") else 0
+)
 
 
 @dataclass
@@ -30,22 +72,550 @@ class Event:
     keyboard: HardKeyboard
 
 
+@dataclass(frozen=True)
+class MotionDelta:
+    """Motion summed over all reports between two take_motion() calls"""
+
+    dx: int = 0
+    dy: int = 0
+    wheel: int = 0
+    packets: int = 0
+    start: float = 0.0  # time of the previous take_motion() (or monitor creation)
+    end: float = 0.0  # time of this take_motion()
+
+    @property
+    def span(self) -> float:
+        return self.end - self.start
+
+
+@dataclass(frozen=True)
+class MonitorState:
+    """Immutable, consistent view of one monitor report"""
+
+    sequence: int = 0  # number of reports received before this one was published
+    time_stamp: float = 0.0
+    buttons: int = 0
+    x: int = 0
+    y: int = 0
+    wheel: int = 0
+    modifiers: int = 0  # keyboard modifier bits (0xE0 → bit0 ... 0xE7 → bit7)
+    keys: tuple[int, ...] = (0,) * 10
+    # 256-bit bitmap: bit n set while HID key n is down, modifiers included
+    key_bits: int = 0
+
+    @property
+    def left(self) -> bool:
+        return bool(self.buttons & 0x01)
+
+    @property
+    def right(self) -> bool:
+        return bool(self.buttons & 0x02)
+
+    @property
+    def middle(self) -> bool:
+        return bool(self.buttons & 0x04)
+
+    @property
+    def side1(self) -> bool:
+        return bool(self.buttons & 0x08)
+
+    @property
+    def side2(self) -> bool:
+        return bool(self.buttons & 0x10)
+
+    def get_keyboard(self, vkey: int) -> bool:
+        return 0 <= vkey <= 0xFF and bool(self.key_bits >> vkey & 1)
+
+    def chord(self, keys: Union[Iterable[int], str, int], exact: bool = False) -> bool:
+        """True if all keys are down (and nothing else with exact=True)"""
+        mask = key_mask(keys)
+        if exact:
+            return self.key_bits == mask
+        return self.key_bits & mask == mask
+
+    def pressed_since(self, earlier: Union["MonitorState", int]) -> list[int]:
+        """Keys down now that were up in the earlier state (or key bitmap)"""
+        return key_codes(self.key_bits & ~_key_bits(earlier))
+
+    def released_since(self, earlier: Union["MonitorState", int]) -> list[int]:
+        """Keys up now that were down in the earlier state (or key bitmap)"""
+        return key_codes(_key_bits(earlier) & ~self.key_bits)
+
+
+def _key_bits(earlier: Union[MonitorState, int]) -> int:
+    return earlier.key_bits if isinstance(earlier, MonitorState) else earlier
+
+
+@dataclass
+class EventColumns:
+    """
+    Events as columns, oldest first.
+
+    numpy arrays when numpy is installed, array.array otherwise. keys holds
+    10 key codes per event (shape (n, 10) with numpy, flat without).
+    """
+
+    time_stamp: Sequence[float]
+    buttons: Sequence[int]
+    x: Sequence[int]
+    y: Sequence[int]
+    wheel: Sequence[int]
+    modifiers: Sequence[int]
+    keys: Sequence[int]
+
+    def __len__(self) -> int:
+        return len(self.time_stamp)
+
+
+if np is not None:
+    _RECORD_DTYPE = np.dtype(
+        [
+            ("time_stamp", "<f8"),
+            ("report_id", "u1"),
+            ("buttons", "u1"),
+            ("x", "<i2"),
+            ("y", "<i2"),
+            ("wheel", "<i2"),
+            ("k_report_id", "u1"),
+            ("modifiers", "u1"),
+            ("keys", "u1", (10,)),
+            ("pad", "V4"),
+        ]
+    )
+
+
+def _columns_from_records(records: bytearray) -> EventColumns:
+    if np is not None:
+        table = np.frombuffer(records, dtype=_RECORD_DTYPE)
+        return EventColumns(
+            table["time_stamp"],
+            table["buttons"],
+            table["x"],
+            table["y"],
+            table["wheel"],
+            table["modifiers"],
+            table["keys"],
+        )
+
+    rows = list(RECORD.iter_unpack(records))
+    keys = array("B")
+    for row in rows:
+        keys.extend(row[8:])
+    return EventColumns(
+        array("d", [row[0] for row in rows]),
+        array("B", [row[2] for row in rows]),
+        array("h", [row[3] for row in rows]),
+        array("h", [row[4] for row in rows]),
+        array("h", [row[5] for row in rows]),
+        array("B", [row[7] for row in rows]),
+        keys,
+    )
+
+
+# EventRing overflow policies
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_COALESCE = "coalesce"
+_OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_COALESCE)
+
+_MOTION = struct.Struct("<hhh")
+
+
+def _key_bitmap(buffer, offset: int) -> int:
+    """Pressed keys of the keyboard report at offset as a 256-bit bitmap"""
+    bitmap = buffer[offset + 1] << 0xE0
+    for key in buffer[offset + 2 : offset + 12]:
+        if key:
+            bitmap |= 1 << key
+    return bitmap
+
+
+def _open_report_socket(
+    bind_address: str,
+    port: int,
+    rcvbuf: Optional[int] = None,
+    reuse_port: bool = False,
+    kernel_timestamps: bool = False,
+) -> socket.socket:
+    """Bound, non-blocking UDP socket for monitor reports"""
+    if kernel_timestamps and (SO_TIMESTAMPNS is None or not _ANCILLARY_SIZE):
+        raise OSError("kernel time stamps are not supported on this platform")
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        if reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        if rcvbuf:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        if kernel_timestamps:
+            sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+        sock.setblocking(False)
+        sock.bind((bind_address, port))
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+def _arrival_time(ancdata: list, now: float) -> float:
+    """
+    Kernel receive time of a datagram on the perf_counter clock.
+
+    The kernel stamps CLOCK_REALTIME, so the time the packet spent queued is
+    measured against time.time_ns() and subtracted from now. Returns now if
+    the datagram carries no time stamp.
+    """
+    for level, kind, data in ancdata:
+        if level == socket.SOL_SOCKET and kind == SO_TIMESTAMPNS:
+            sec, nsec = _TIMESPEC.unpack_from(data)
+            queued = time.time_ns() - sec * 1_000_000_000 - nsec
+            return now - max(queued, 0) / 1e9
+    return now
+
+
+def _clamp16(value: int) -> int:
+    return -32768 if value < -32768 else 32767 if value > 32767 else value
+
+
+def _check_maxlen(maxlen: Optional[int]):
+    if maxlen is not None and maxlen < 1:
+        raise ValueError(f"maxlen must be None or at least 1: {maxlen}")
+
+
+class EventRing:
+    """
+    Preallocated ring of fixed-size monitor records.
+
+    The listener thread copies every report into the next 32 byte slot; an
+    Event object is only built when a consumer calls get(). The read side
+    mimics queue.Queue (get, get_nowait, qsize, empty).
+
+    Unbounded by default: when full, the ring doubles its capacity so that no
+    event is lost. With maxlen set, memory is fixed and a full ring applies
+    the overflow policy:
+
+    - "drop_oldest": discard the oldest event (consumers see fresh input)
+    - "drop_newest": discard the incoming event
+    - "coalesce": add the incoming mouse motion to the newest event if buttons
+      and keyboard are unchanged, otherwise drop the oldest
+    """
+
+    def __init__(
+        self,
+        capacity: int = 4096,
+        maxlen: Optional[int] = None,
+        policy: str = OVERFLOW_DROP_OLDEST,
+    ):
+        """
+        Args:
+            capacity (int, optional): Initial number of records. Defaults to 4096.
+            maxlen (int|None, optional): Maximum number of records. None grows without limit. Defaults to None.
+            policy (str, optional): Overflow policy when maxlen is reached. Defaults to "drop_oldest".
+        """
+        if policy not in _OVERFLOW_POLICIES:
+            raise ValueError(f"unknown overflow policy: {policy}")
+        _check_maxlen(maxlen)
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1: {capacity}")
+        self.maxlen = maxlen
+        self.policy = policy
+        self.capacity = maxlen if maxlen is not None else capacity
+        self._buf = bytearray(self.capacity * RECORD.size)
+        # absolute read/write counters; slot = counter % capacity
+        self._head = 0
+        self._tail = 0
+        self._cond = threading.Condition(threading.Lock())
+
+        # overflow accounting
+        self.overflows = 0  # pushes that found the ring full
+        self.dropped = 0  # events discarded
+        self.coalesced = 0  # events merged into the newest one
+
+    def set_limit(self, maxlen: Optional[int], policy: str = OVERFLOW_DROP_OLDEST):
+        """
+        Bound (or unbound with None) the ring and choose the overflow policy.
+        Events beyond the new limit are dropped, oldest first.
+        """
+        if policy not in _OVERFLOW_POLICIES:
+            raise ValueError(f"unknown overflow policy: {policy}")
+        _check_maxlen(maxlen)
+        with self._cond:
+            self.policy = policy
+            self.maxlen = maxlen
+            if maxlen is not None:
+                excess = self._tail - self._head - maxlen
+                if excess > 0:
+                    self._head += excess
+                    self.dropped += excess
+                self._resize(maxlen)
+
+    def push(self, report, time_stamp: float):
+        """Append one 20 byte report (bytes-like)"""
+        with self._cond:
+            if self._tail - self._head >= self.capacity:
+                if self.maxlen is None:
+                    self._resize(self.capacity * 2)
+                elif not self._overflow(report, time_stamp):
+                    return
+            offset = (self._tail % self.capacity) * RECORD.size
+            _TIME_STAMP.pack_into(self._buf, offset, time_stamp)
+            self._buf[offset + 8 : offset + 8 + REPORT_SIZE] = report
+            self._tail += 1
+            self._cond.notify()
+
+    def _overflow(self, report, time_stamp: float) -> bool:
+        """Apply the policy to a full ring. Returns True if report still needs a slot"""
+        self.overflows += 1
+        if self.policy == OVERFLOW_DROP_NEWEST:
+            self.dropped += 1
+            return False
+
+        if self.policy == OVERFLOW_COALESCE:
+            buf = self._buf
+            offset = ((self._tail - 1) % self.capacity) * RECORD.size
+            if (
+                buf[offset + 8 : offset + 10] == report[:2]
+                and buf[offset + 16 : offset + 28] == report[8:REPORT_SIZE]
+            ):
+                x, y, wheel = _MOTION.unpack_from(buf, offset + 10)
+                dx, dy, dwheel = _MOTION.unpack_from(report, 2)
+                _MOTION.pack_into(
+                    buf,
+                    offset + 10,
+                    _clamp16(x + dx),
+                    _clamp16(y + dy),
+                    _clamp16(wheel + dwheel),
+                )
+                _TIME_STAMP.pack_into(buf, offset, time_stamp)
+                self.coalesced += 1
+                self._cond.notify()
+                return False
+
+        self._head += 1
+        self.dropped += 1
+        return True
+
+    def _resize(self, capacity: int):
+        count = self._tail - self._head
+        new_buf = bytearray(capacity * RECORD.size)
+        start = (self._head % self.capacity) * RECORD.size
+        first = self._buf[start : start + count * RECORD.size]
+        new_buf[: len(first)] = first
+        new_buf[len(first) : count * RECORD.size] = self._buf[
+            : count * RECORD.size - len(first)
+        ]
+        self._buf = new_buf
+        self.capacity = capacity
+        self._head = 0
+        self._tail = count
+
+    def _pop(self) -> Event:
+        offset = (self._head % self.capacity) * RECORD.size
+        self._head += 1
+        return _event_from_record(self._buf, offset)
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Event:
+        """Remove and return the oldest event (raises queue.Empty like queue.Queue)"""
+        with self._cond:
+            if not block:
+                if self._tail == self._head:
+                    raise queue.Empty
+            elif timeout is None:
+                while self._tail == self._head:
+                    self._cond.wait()
+            else:
+                deadline = time.monotonic() + timeout
+                while self._tail == self._head:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise queue.Empty
+                    self._cond.wait(remaining)
+            return self._pop()
+
+    def get_nowait(self) -> Event:
+        return self.get(block=False)
+
+    def drain(self, max_n: Optional[int] = None) -> EventColumns:
+        """
+        Remove up to max_n of the oldest events at once, without building an
+        Event per report.
+
+        Args:
+            max_n (int|None, optional): Maximum number of events. Defaults to all queued.
+
+        Returns:
+            EventColumns: Columns of the removed events
+        """
+        with self._cond:
+            count = self._tail - self._head
+            if max_n is not None:
+                count = min(count, max_n)
+            start = (self._head % self.capacity) * RECORD.size
+            end = start + count * RECORD.size
+            records = self._buf[start:end]
+            if end > len(self._buf):
+                records += self._buf[: end - len(self._buf)]
+            self._head += count
+        return _columns_from_records(records)
+
+    def qsize(self) -> int:
+        return self._tail - self._head
+
+    def empty(self) -> bool:
+        return self._tail == self._head
+
+    def clear(self):
+        with self._cond:
+            self._head = self._tail
+
+
+def _event_from_record(buffer, offset: int) -> Event:
+    ts, report_id, buttons, x, y, wheel, k_report_id, k_buttons, *k_data = (
+        RECORD.unpack_from(buffer, offset)
+    )
+    return Event(
+        HardMouse(report_id, buttons, x, y, wheel, ts),
+        HardKeyboard(k_report_id, k_buttons, k_data),
+    )
+
+
 class Monitor:
-    def __init__(self, port: int, monitor_timeout: Optional[float] = 0.003):
+    def __init__(
+        self,
+        port: int,
+        monitor_timeout: Optional[float] = 0.003,
+        max_events: Optional[int] = None,
+        overflow: str = OVERFLOW_DROP_OLDEST,
+        bind_address: str = "0.0.0.0",
+        rcvbuf: Optional[int] = None,
+        reuse_port: bool = False,
+        kernel_timestamps: bool = False,
+    ):
+        """
+        Args:
+            port (int): Port to receive monitor reports on
+            monitor_timeout (float|None, optional): Idle time before a neutral (zero motion) event. None disables it. Defaults to 0.003.
+            max_events (int|None, optional): Bound of the events ring. None is unbounded. Defaults to None.
+            overflow (str, optional): Policy when the ring is full: "drop_oldest", "drop_newest" or "coalesce". Defaults to "drop_oldest".
+            bind_address (str, optional): Local address to receive on. Defaults to "0.0.0.0".
+            rcvbuf (int|None, optional): SO_RCVBUF size in bytes, so bursts are not dropped. Defaults to the system default.
+            reuse_port (bool, optional): Set SO_REUSEPORT before binding. Defaults to False.
+            kernel_timestamps (bool, optional): Stamp events with the kernel receive time (SO_TIMESTAMPNS, Linux) instead of the time the listener got to them. Defaults to False.
+        """
         self.port = port
+        self.bind_address = bind_address
+        self.rcvbuf = rcvbuf
+        self.reuse_port = reuse_port
+        self.kernel_timestamps = kernel_timestamps
+        # time between kernel arrival and processing of the latest report
+        # (kernel_timestamps only)
+        self.receive_delay = 0.0
         self.running = False
         self.sock: Optional[socket.socket] = None
         self.thread: Optional[threading.Thread] = None
 
-        self.hard_mouse = HardMouse()
-        self.hard_keyboard = HardKeyboard()
+        # latest report as immutable bytes (time stamp, sequence, report),
+        # replaced as a whole so readers never see a torn state
+        self._published = bytes(_PUBLISHED.size + REPORT_SIZE)
+        # (published bytes, MonitorState built from them), built on demand
+        self._snapshot = (self._published, MonitorState())
+        self._sequence = 0
+        self._recv_buf = bytearray(1024)
 
-        self.events = queue.Queue()
+        self.events = EventRing(maxlen=max_events, policy=overflow)
 
         self.is_neutral_event_sent = False
         self.monitor_timeout = monitor_timeout
 
-        self._lock = threading.Lock()
+        # edge kind -> subscriptions; replaced as a whole on (un)subscribe
+        self._subscriptions: dict[str, tuple[Subscription, ...]] = {}
+        self._subscriptions_lock = threading.Lock()
+        # bitmap of the keys pressed in the latest report
+        self._keys = 0
+        # running totals (x, y, wheel, packets) since start, replaced per report;
+        # take_motion() returns the difference to the totals it saw last
+        self._motion_total = (0, 0, 0, 0)
+        self._motion_taken = (0, 0, 0, 0, time.perf_counter())
+
+        # callables receiving (report, time_stamp) for every valid report
+        self._taps: list[Callable[[memoryview, float], None]] = []
+
+    def add_tap(self, tap: Callable[[memoryview, float], None]):
+        """
+        Call tap(report, time_stamp) from the listener thread for every valid
+        20 byte report received. report is a view of the receive buffer and is
+        only valid during the call. An exception from tap is printed and the
+        listener carries on.
+        """
+        self._taps = self._taps + [tap]
+
+    def remove_tap(self, tap: Callable[[memoryview, float], None]):
+        # ==, not is: each access to a bound method creates a new object
+        self._taps = [t for t in self._taps if t != tap]
+
+    def subscribe(
+        self,
+        kind: str,
+        callback: Callable[[InputEdge], None],
+        buttons: Optional[int] = None,
+        keys: Optional[list[int]] = None,
+    ) -> Subscription:
+        """
+        Call callback(InputEdge) on every matching edge.
+
+        Edges are detected once per report in the listener thread, and the
+        callback runs there too, so keep it short.
+
+        Args:
+            kind (str): "button_down", "button_up", "key_down", "key_up", "wheel" or "motion"
+            callback (Callable): Receives one InputEdge per changed button or key
+            buttons (int|None, optional): Button bits of interest (0x01 left, ...). Defaults to all.
+            keys (list[int]|None, optional): HID key codes of interest (0xE0-0xE7 for modifiers). Defaults to all.
+
+        Returns:
+            Subscription: Call cancel() to unsubscribe
+        """
+        if kind not in EDGE_KINDS:
+            raise ValueError(f"unknown edge kind: {kind}")
+        mask = -1
+        if buttons is not None:
+            mask = buttons
+        elif keys is not None:
+            mask = key_mask(keys)
+        subscription = Subscription(self, kind, callback, mask)
+        with self._subscriptions_lock:
+            subscriptions = dict(self._subscriptions)
+            subscriptions[kind] = subscriptions.get(kind, ()) + (subscription,)
+            self._subscriptions = subscriptions
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._subscriptions_lock:
+            subscriptions = dict(self._subscriptions)
+            remaining = tuple(
+                s
+                for s in subscriptions.get(subscription.kind, ())
+                if s is not subscription
+            )
+            if remaining:
+                subscriptions[subscription.kind] = remaining
+            else:
+                subscriptions.pop(subscription.kind, None)
+            self._subscriptions = subscriptions
+
+    def stream(
+        self,
+        kind: str,
+        buttons: Optional[int] = None,
+        keys: Optional[list[int]] = None,
+        maxsize: int = 1024,
+    ) -> AsyncSubscription:
+        """
+        Same as subscribe(), but delivers edges to the running asyncio loop.
+        Must be called from a coroutine; iterate the result with `async for`.
+        """
+        stream = AsyncSubscription(maxsize)
+        stream.subscription = self.subscribe(kind, stream._deliver, buttons, keys)
+        return stream
 
     def start(self):
         """monitor start"""
@@ -53,9 +623,15 @@ class Monitor:
             return
 
         try:
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            self.sock.settimeout(self.monitor_timeout)
-            self.sock.bind(("0.0.0.0", self.port))
+            self.sock = _open_report_socket(
+                self.bind_address,
+                self.port,
+                self.rcvbuf,
+                self.reuse_port,
+                self.kernel_timestamps,
+            )
+            # written to by stop() to wake the listener out of select()
+            self._wakeup_r, self._wakeup_w = socket.socketpair()
 
             self.running = True
             self.thread = threading.Thread(target=self._listen_loop, daemon=True)
@@ -74,145 +650,332 @@ class Monitor:
 
         if self.sock:
             try:
-                self.sock.close()
+                self._wakeup_w.send(b"\0")
             except Exception:
                 pass
-            self.sock = None
 
         if self.thread and self.thread.is_alive():
             self.thread.join(timeout=2.0)
 
-    def _listen_loop(self):
-        """monitor loop"""
-        try:
-            while self.running and self.sock:
+        if self.sock:
+            for sock in (self.sock, self._wakeup_r, self._wakeup_w):
                 try:
-                    data, _addr = self.sock.recvfrom(1024)
-                except socket.timeout:
-                    if self.is_neutral_event_sent:
-                        continue
-
-                    with self._lock:
-                        neutral_mouse = HardMouse(
-                            report_id=self.hard_mouse.report_id,
-                            buttons=self.hard_mouse.buttons,
-                            x=0,
-                            y=0,
-                            wheel=self.hard_mouse.wheel,
-                            time_stamp=time.perf_counter(),
-                        )
-                        current_keyboard = self.hard_keyboard
+                    sock.close()
+                except Exception:
+                    pass
+            self.sock = None
 
-                        self.hard_mouse = neutral_mouse
-                        self.hard_keyboard = current_keyboard
-                        self.events.put(Event(neutral_mouse, current_keyboard))
+    def _listen_loop(self):
+        """
+        monitor loop
+
+        Blocks in select() until a report arrives. The neutral event deadline
+        is only armed after a report, so an idle mouse causes no wakeups.
+        """
+        view = memoryview(self._recv_buf)
+        report = view[:REPORT_SIZE]
+        perf_counter = time.perf_counter
+        monitor_timeout = self.monitor_timeout
+        kernel_timestamps = self.kernel_timestamps
+        selector = selectors.DefaultSelector()
+        try:
+            sock = self.sock
+            recv_into = sock.recv_into
+            recvmsg_into = sock.recvmsg_into if kernel_timestamps else None
+            buffers = [view]
+            selector.register(sock, selectors.EVENT_READ)
+            selector.register(self._wakeup_r, selectors.EVENT_READ)
+
+            # the first neutral event is due monitor_timeout after start, as
+            # with the former socket timeout
+            deadline = None
+            if monitor_timeout is not None and not self.is_neutral_event_sent:
+                deadline = perf_counter() + monitor_timeout
+
+            select = selector.select
+            while self.running:
+                if deadline is None:
+                    ready = select()
+                else:
+                    ready = select(max(0.0, deadline - perf_counter()))
+
+                if not ready:
+                    deadline = None
+                    if not self.is_neutral_event_sent:
+                        self._emit_neutral()
+                    continue
 
-                    self.is_neutral_event_sent = True
+                try:
+                    if kernel_timestamps:
+                        nbytes, ancdata, _, _ = recvmsg_into(buffers, _ANCILLARY_SIZE)
+                    else:
+                        nbytes = recv_into(view)
+                except BlockingIOError:
+                    # readiness was for the wakeup socket
                     continue
                 except OSError as e:
                     if self.running:
                         print(f"Monitor receive error: {e}")
                     break
 
-                try:
-                    new_mouse, new_keyboard = self._build_mouse_and_keyboard_from_data(
-                        data
-                    )
-                except (ValueError, struct.error):
+                if nbytes < REPORT_SIZE:
                     continue
-
-                with self._lock:
-                    self.events.put(Event(new_mouse, new_keyboard))
-                    self.hard_mouse = new_mouse
-                    self.hard_keyboard = new_keyboard
-
-                self.last_event_time = time.perf_counter()
-                self.is_neutral_event_sent = False
+                now = perf_counter()
+                if kernel_timestamps:
+                    arrival = _arrival_time(ancdata, now)
+                    self.receive_delay = now - arrival
+                    now = arrival
+                self._ingest(report, now)
+                if monitor_timeout is not None:
+                    deadline = now + monitor_timeout
 
         except Exception as e:
             print(f"Monitor loop error: {e}")
         finally:
-            if self.sock:
-                try:
-                    self.sock.close()
-                except Exception:
-                    pass
+            selector.close()
+
+    def _ingest(self, report, time_stamp: float):
+        """Process one 20 byte report (bytes-like) received at time_stamp"""
+        for tap in self._taps:
+            try:
+                tap(report, time_stamp)
+            except Exception as e:
+                print(f"Warning:{e}")
+
+        self.events.push(report, time_stamp)
+        previous = self._published
+        self._sequence += 1
+        self._published = _PUBLISHED.pack(time_stamp, self._sequence) + report
+
+        x, y, wheel = _MOTION.unpack_from(report, 2)
+        total_x, total_y, total_wheel, packets = self._motion_total
+        self._motion_total = (
+            total_x + x,
+            total_y + y,
+            total_wheel + wheel,
+            packets + 1,
+        )
+
+        previous_keys = self._keys
+        if report[8:REPORT_SIZE] != previous[24:]:
+            self._keys = _key_bitmap(report, 8)
+
+        self.last_event_time = time_stamp
+        self.is_neutral_event_sent = False
+
+        # published before dispatch, so callbacks see the state that caused them
+        subscriptions = self._subscriptions
+        if subscriptions:
+            self._dispatch_edges(
+                subscriptions, report, previous, previous_keys, time_stamp
+            )
+
+    def _dispatch_edges(
+        self, subscriptions, report, previous, previous_keys: int, ts: float
+    ):
+        """Diff report against the previous one and notify matching subscribers"""
+        buttons = report[1]
+        changed = buttons ^ previous[17]
+        if changed:
+            x, y, wheel = _MOTION.unpack_from(report, 2)
+            for kind, bits in (
+                (BUTTON_DOWN, changed & buttons),
+                (BUTTON_UP, changed & ~buttons),
+            ):
+                for subscription in subscriptions.get(kind, ()):
+                    for bit in key_codes(bits & subscription.mask):
+                        self._deliver(
+                            subscription, InputEdge(kind, 1 << bit, x, y, wheel, ts)
+                        )
+
+        keys = self._keys
+        changed = keys ^ previous_keys
+        if changed:
+            for kind, bits in ((KEY_DOWN, changed & keys), (KEY_UP, changed & ~keys)):
+                for subscription in subscriptions.get(kind, ()):
+                    for code in key_codes(bits & subscription.mask):
+                        self._deliver(
+                            subscription, InputEdge(kind, code, time_stamp=ts)
+                        )
+
+        if MOTION in subscriptions or WHEEL in subscriptions:
+            x, y, wheel = _MOTION.unpack_from(report, 2)
+            # buttons filter motion/wheel by held buttons (e.g. drags)
+            for kind, moved in ((MOTION, x or y), (WHEEL, wheel)):
+                if not moved:
+                    continue
+                edge = InputEdge(kind, buttons, x, y, wheel, ts)
+                for subscription in subscriptions.get(kind, ()):
+                    if subscription.mask == -1 or buttons & subscription.mask:
+                        self._deliver(subscription, edge)
 
-    def _build_mouse_and_keyboard_from_data(
-        self, data: bytes
-    ) -> tuple[HardMouse, HardKeyboard]:
-        if len(data) < 20:
-            raise ValueError(f"insufficient monitor packet: {len(data)} bytes")
-
-        # Mouse Parse 8 bytes
-        # struct: report_id(1) + buttons(1) + x(2) + y(2) + wheel(2)
-        report_id, buttons, x, y, wheel = struct.unpack_from("<BBhhh", data, 0)
-        new_mouse = HardMouse(
-            report_id=report_id,
-            buttons=buttons,
-            x=x,
-            y=y,
-            wheel=wheel,
-            time_stamp=time.perf_counter(),
+    @staticmethod
+    def _deliver(subscription: Subscription, edge: InputEdge):
+        try:
+            subscription.callback(edge)
+        except Exception as e:
+            print(f"Warning:{e}")
+
+    def _emit_neutral(self, time_stamp: Optional[float] = None):
+        """
+        Repeat the latest report with zero motion once the mouse stopped.
+
+        Args:
+            time_stamp (float|None, optional): Event time. Defaults to now.
+        """
+        if time_stamp is None:
+            time_stamp = time.perf_counter()
+        state = bytearray(self._published)
+        _PUBLISHED.pack_into(state, 0, time_stamp, self._sequence)
+        _XY.pack_into(state, _PUBLISHED.size + 2, 0, 0)
+        self.events.push(memoryview(state)[_PUBLISHED.size :], time_stamp)
+        self._published = bytes(state)
+        self.is_neutral_event_sent = True
+
+    def take_motion(self) -> MotionDelta:
+        """
+        Motion of every report since the previous call, summed.
+
+        Unlike move/wheel (latest report only), nothing is lost when polling
+        slower than the mouse report rate, and the event queue is untouched.
+        """
+        now = time.perf_counter()
+        total = self._motion_total
+        x, y, wheel, packets, start = self._motion_taken
+        self._motion_taken = (*total, now)
+        return MotionDelta(
+            total[0] - x,
+            total[1] - y,
+            total[2] - wheel,
+            total[3] - packets,
+            start,
+            now,
+        )
+
+    def drain(self, max_n: Optional[int] = None) -> EventColumns:
+        """
+        Remove up to max_n queued events as columns (numpy arrays if available).
+
+        Example:
+            cols = monitor.drain()
+            speed = np.hypot(cols.x, cols.y) / np.diff(cols.time_stamp, prepend=cols.time_stamp[0])
+        """
+        return self.events.drain(max_n)
+
+    def snapshot(self) -> MonitorState:
+        """
+        Latest buttons, axes and keys as one immutable MonitorState.
+
+        Never blocks the listener thread; all fields come from the same report.
+        """
+        published = self._published
+        source, snapshot = self._snapshot
+        if source is published:
+            return snapshot
+        ts, sequence, _, buttons, x, y, wheel, _, modifiers, *keys = (
+            _PUBLISHED_STATE.unpack(published)
+        )
+        snapshot = MonitorState(
+            sequence,
+            ts,
+            buttons,
+            x,
+            y,
+            wheel,
+            modifiers,
+            tuple(keys),
+            _key_bitmap(published, 24),
         )
+        self._snapshot = (published, snapshot)
+        return snapshot
 
-        # Keyboard parse 12 bytes
-        # struct: report_id(1) + buttons(1) + data[10](10)
-        k_report_id, k_buttons, *k_data = struct.unpack_from("<BB10B", data, 8)
-        new_keyboard = HardKeyboard(
-            report_id=k_report_id,
-            buttons=k_buttons,
-            data=list(k_data),
+    @property
+    def hard_mouse(self) -> HardMouse:
+        """Latest mouse report"""
+        ts, _, report_id, buttons, x, y, wheel = struct.unpack_from(
+            "<dQBBhhh", self._published
         )
+        return HardMouse(report_id, buttons, x, y, wheel, ts)
 
-        return new_mouse, new_keyboard
+    @property
+    def hard_keyboard(self) -> HardKeyboard:
+        """Latest keyboard report"""
+        published = self._published
+        return HardKeyboard(published[24], published[25], list(published[26:]))
 
     @property
     def left(self) -> bool:
-        with self._lock:
-            return bool(self.hard_mouse.buttons & 0x01)
+        return bool(self._published[17] & 0x01)
 
     @property
     def right(self) -> bool:
-        with self._lock:
-            return bool(self.hard_mouse.buttons & 0x02)
+        return bool(self._published[17] & 0x02)
 
     @property
     def middle(self) -> bool:
-        with self._lock:
-            return bool(self.hard_mouse.buttons & 0x04)
+        return bool(self._published[17] & 0x04)
 
     @property
     def side1(self) -> bool:
-        with self._lock:
-            return bool(self.hard_mouse.buttons & 0x08)
+        return bool(self._published[17] & 0x08)
 
     @property
     def side2(self) -> bool:
-        with self._lock:
-            return bool(self.hard_mouse.buttons & 0x10)
+        return bool(self._published[17] & 0x10)
 
     def get_keyboard(self, vkey: int) -> bool:
-        with self._lock:
-            if 0xE0 <= vkey <= 0xE7:
-                bit_pos = vkey - 0xE0
-                return bool(self.hard_keyboard.buttons & (1 << bit_pos))
-            else:
-                return vkey in self.hard_keyboard.data
+        return 0 <= vkey <= 0xFF and bool(self._keys >> vkey & 1)
+
+    @property
+    def keys(self) -> int:
+        """Pressed keys as a 256-bit bitmap (bit n: HID key n, 0xE0-0xE7 modifiers)"""
+        return self._keys
+
+    def pressed_since(self, earlier: Union[MonitorState, int]) -> list[int]:
+        """
+        Keys pressed now that were up earlier.
+
+        Takes a `keys` bitmap or a MonitorState, like MonitorState.pressed_since.
+
+        Example:
+            before = monitor.keys
+            ...
+            for key in monitor.pressed_since(before): ...
+        """
+        return key_codes(self._keys & ~_key_bits(earlier))
+
+    def released_since(self, earlier: Union[MonitorState, int]) -> list[int]:
+        """Keys up now that were down earlier (`keys` bitmap or MonitorState)"""
+        return key_codes(_key_bits(earlier) & ~self._keys)
+
+    def chord(self, keys: Union[Iterable[int], str, int], exact: bool = False) -> bool:
+        """
+        Test a key combination in one call.
+
+        Args:
+            keys (Iterable[int]|str|int): Key codes, "LEFT_CTRL+LEFT_SHIFT+K" style HidKey names, or a bitmap from key_mask() (fastest)
+            exact (bool, optional): Also require that no other key is down. Defaults to False.
+
+        Returns:
+            bool: True if every key of the chord is down
+        """
+        mask = key_mask(keys)
+        if exact:
+            return self._keys == mask
+        return self._keys & mask == mask
 
     @property
     def move(self) -> tuple[int, int]:
-        with self._lock:
-            return (self.hard_mouse.x, self.hard_mouse.y)
+        return _XY.unpack_from(self._published, 18)
 
     @property
     def wheel(self) -> int:
-        with self._lock:
-            return self.hard_mouse.wheel
+        return struct.unpack_from("<h", self._published, 22)[0]
 
     @property
     def is_running(self) -> bool:
-        return self.running
+        # False once the listener thread died, even before stop()
+        return self.running and self.thread is not None and self.thread.is_alive()
 
 
 class KmboxNetMonitorError(Exception):
@@ -0,0 +1,323 @@
+import selectors
+import socket
+import threading
+import time
+from collections import deque
+from typing import Iterable, Optional
+
+from .kmbox import CMD_MONITOR, CommandHandle, KmboxError, KmboxNet
+from .monitor import (
+    _ANCILLARY_SIZE,
+    REPORT_SIZE,
+    KmboxNetMonitorError,
+    Monitor,
+    _arrival_time,
+    _open_report_socket,
+)
+
+
+class KmboxPool:
+    """
+    Drives several Kmbox Net devices at a constant thread count.
+
+    Command sockets are multiplexed by one selector in the calling thread
+    (submit/broadcast/wait). Monitor reports of all devices arrive on one
+    shared socket and are demultiplexed by source address in a single
+    listener thread into each device's own Monitor (state, events,
+    subscriptions), which is not started on its own. As with a started
+    Monitor, the first neutral event is emitted monitor_timeout after the
+    device is added, unless a report arrives first.
+    """
+
+    def __init__(
+        self,
+        monitor_port: Optional[int] = 5002,
+        monitor_timeout: Optional[float] = 0.003,
+        bind_address: str = "0.0.0.0",
+        rcvbuf: Optional[int] = None,
+        reuse_port: bool = False,
+        kernel_timestamps: bool = False,
+    ):
+        """
+        Args:
+            monitor_port (int|None, optional): Shared monitor port. None to disable monitors. Defaults to 5002.
+            monitor_timeout (float|None, optional): Neutral event timeout of every device monitor. Defaults to 0.003.
+            bind_address (str, optional): Address of the shared monitor socket. Defaults to "0.0.0.0".
+            rcvbuf (int|None, optional): SO_RCVBUF size of the shared monitor socket. Defaults to the system default.
+            reuse_port (bool, optional): Set SO_REUSEPORT on the shared monitor socket. Defaults to False.
+            kernel_timestamps (bool, optional): Stamp events with the kernel receive time (see Monitor). Defaults to False.
+        """
+        self.monitor_port = monitor_port
+        self.monitor_timeout = monitor_timeout
+        self.bind_address = bind_address
+        self.rcvbuf = rcvbuf
+        self.reuse_port = reuse_port
+        self.kernel_timestamps = kernel_timestamps
+
+        self.devices: dict[str, KmboxNet] = {}
+        self._selector = selectors.DefaultSelector()
+        # device IP -> monitor fed from the shared socket
+        self._monitors: dict[str, Monitor] = {}
+        # monitors added since the listener last looked, to arm their first
+        # neutral event
+        self._arming: deque[Monitor] = deque()
+
+        self.running = False
+        self.sock: Optional[socket.socket] = None
+        self.thread: Optional[threading.Thread] = None
+        # datagrams from addresses of no registered device
+        self.stray = 0
+
+    def add(self, name: str, ip: str, port: int, uuid: str, **kwargs) -> KmboxNet:
+        """
+        Connect a device and register it under name.
+
+        Args:
+            name (str): Key of the device in the pool
+            ip (str): Device IP address
+            port (int): Device port
+            uuid (str): Device UUID
+            **kwargs: Other KmboxNet arguments (window, retries, stats, ...)
+
+        Returns:
+            KmboxNet: The connected device
+        """
+        if name in self.devices:
+            raise KmboxError(f"Device already in pool: {name}")
+        if self.monitor_port is not None and ip in self._monitors:
+            # monitor reports are told apart by source IP only
+            raise KmboxError(f"Another device in pool already uses IP {ip}")
+        kmbox = KmboxNet(ip, port, uuid, monitor_port=None, **kwargs)
+
+        if self.monitor_port is not None:
+            try:
+                self._start_monitor()
+                rand_override = self.monitor_port | (0xAA55 << 16)
+                result, _ = kmbox.send_cmd(CMD_MONITOR, rand_override=rand_override)
+                if not result:
+                    raise KmboxError("Device monitor setup failed")
+            except Exception:
+                # not handed to the caller, so release its socket here
+                kmbox._sock.close()
+                raise
+            kmbox.monitor = Monitor(self.monitor_port, self.monitor_timeout)
+            self._monitors[ip] = kmbox.monitor
+            if self.monitor_timeout is not None:
+                self._arming.append(kmbox.monitor)
+                self._wakeup_w.send(b"\0")
+
+        self.devices[name] = kmbox
+        self._selector.register(kmbox, selectors.EVENT_READ, kmbox)
+        return kmbox
+
+    def remove(self, name: str) -> KmboxNet:
+        """Unregister a device; it keeps working on its own"""
+        kmbox = self.devices.pop(name)
+        self._selector.unregister(kmbox)
+        self._monitors.pop(kmbox._server_addr[0], None)
+        return kmbox
+
+    def __getitem__(self, name: str) -> KmboxNet:
+        return self.devices[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.devices
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def submit(
+        self,
+        name: str,
+        cmd: int,
+        payload: bytes = b"",
+        rand_override: Optional[int] = None,
+    ) -> CommandHandle:
+        """Send a command to one device without waiting (see KmboxNet.submit)"""
+        return self.devices[name].submit(cmd, payload, rand_override)
+
+    def broadcast(
+        self,
+        cmd: int,
+        payload: bytes = b"",
+        rand_override: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> dict[str, bool]:
+        """
+        Send the same command to every device and wait for all answers.
+
+        The round trips overlap, so this takes about one RTT, not one per device.
+
+        Returns:
+            dict[str, bool]: Result per device name
+        """
+        handles = {
+            name: kmbox.submit(cmd, payload, rand_override)
+            for name, kmbox in self.devices.items()
+        }
+        self.wait(handles.values(), timeout)
+        return {name: handle.done and handle.ok for name, handle in handles.items()}
+
+    def wait(
+        self, handles: Iterable[CommandHandle], timeout: Optional[float] = None
+    ) -> bool:
+        """
+        Receive responses of all devices until every handle is done.
+
+        Args:
+            handles (Iterable[CommandHandle]): Handles returned by submit()
+            timeout (float|None, optional): Give up after this many seconds. Defaults to each command's deadline.
+
+        Returns:
+            bool: True if every command was acknowledged
+        """
+        handles = list(handles)
+        limit = None if timeout is None else time.perf_counter() + timeout
+        while not all(handle.done for handle in handles):
+            now = time.perf_counter()
+            if limit is not None and now >= limit:
+                break
+            wake = min(
+                (kmbox._service(now) for kmbox in self.devices.values()),
+                default=now,
+            )
+            if limit is not None:
+                wake = min(wake, limit)
+            self.pump(max(wake - now, 0.0))
+        return all(handle.done and handle.ok for handle in handles)
+
+    def pump(self, timeout: float = 0.0) -> int:
+        """
+        Wait up to timeout for any command socket and read every queued response.
+
+        Returns:
+            int: Number of datagrams processed
+        """
+        count = 0
+        for key, _ in self._selector.select(timeout):
+            kmbox: KmboxNet = key.data
+            with kmbox._io_lock:
+                while kmbox._recv_response(0.0):
+                    count += 1
+        return count
+
+    def _start_monitor(self):
+        if self.running:
+            return
+        try:
+            self.sock = _open_report_socket(
+                self.bind_address,
+                self.monitor_port,
+                self.rcvbuf,
+                self.reuse_port,
+                self.kernel_timestamps,
+            )
+            self._wakeup_r, self._wakeup_w = socket.socketpair()
+
+            self.running = True
+            self.thread = threading.Thread(target=self._monitor_loop, daemon=True)
+            self.thread.start()
+        except Exception as e:
+            self.running = False
+            if self.sock:
+                self.sock.close()
+                self.sock = None
+            raise KmboxNetMonitorError(f"Monitor start failed: {e}")
+
+    def _monitor_loop(self):
+        """Shared monitor socket: demultiplex reports by source IP"""
+        buffer = bytearray(1024)
+        view = memoryview(buffer)
+        report = view[:REPORT_SIZE]
+        perf_counter = time.perf_counter
+        monitor_timeout = self.monitor_timeout
+        kernel_timestamps = self.kernel_timestamps
+        # neutral event deadline per monitor, armed after each report
+        deadlines: dict[Monitor, float] = {}
+        selector = selectors.DefaultSelector()
+        try:
+            recvfrom_into = self.sock.recvfrom_into
+            recvmsg_into = self.sock.recvmsg_into if kernel_timestamps else None
+            buffers = [view]
+            selector.register(self.sock, selectors.EVENT_READ)
+            selector.register(self._wakeup_r, selectors.EVENT_READ)
+            select = selector.select
+
+            while self.running:
+                while self._arming:
+                    deadlines[self._arming.popleft()] = perf_counter() + monitor_timeout
+                if deadlines:
+                    ready = select(max(0.0, min(deadlines.values()) - perf_counter()))
+                else:
+                    ready = select()
+
+                now = perf_counter()
+                for monitor, deadline in list(deadlines.items()):
+                    if deadline <= now:
+                        del deadlines[monitor]
+                        if not monitor.is_neutral_event_sent:
+                            monitor._emit_neutral()
+                if not ready:
+                    continue
+                if any(key.fileobj is self._wakeup_r for key, _ in ready):
+                    self._wakeup_r.recv(64)
+                    continue
+
+                try:
+                    if kernel_timestamps:
+                        nbytes, ancdata, _, addr = recvmsg_into(
+                            buffers, _ANCILLARY_SIZE
+                        )
+                    else:
+                        nbytes, addr = recvfrom_into(view)
+                except BlockingIOError:
+                    continue
+                except OSError as e:
+                    if self.running:
+                        print(f"Monitor receive error: {e}")
+                    break
+
+                monitor = self._monitors.get(addr[0])
+                if monitor is None or nbytes < REPORT_SIZE:
+                    self.stray += 1
+                    continue
+                now = perf_counter()
+                if kernel_timestamps:
+                    arrival = _arrival_time(ancdata, now)
+                    monitor.receive_delay = now - arrival
+                    now = arrival
+                monitor._ingest(report, now)
+                if monitor_timeout is not None:
+                    deadlines[monitor] = now + monitor_timeout
+
+        except Exception as e:
+            print(f"Monitor loop error: {e}")
+        finally:
+            selector.close()
+
+    def close(self):
+        """Stop the shared monitor listener and release all devices"""
+        self.running = False
+        if self.sock:
+            try:
+                self._wakeup_w.send(b"\0")
+            except Exception:
+                pass
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+        if self.sock:
+            for sock in (self.sock, self._wakeup_r, self._wakeup_w):
+                try:
+                    sock.close()
+                except Exception:
+                    pass
+            self.sock = None
+        for name in list(self.devices):
+            self.remove(name)
+        self._selector.close()
+
+    def __enter__(self) -> "KmboxPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
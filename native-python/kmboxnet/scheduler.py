@@ -0,0 +1,113 @@
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Union
+
+from .kmbox import KmboxNet
+from .timing import SPIN_THRESHOLD, sleep_until
+
+
+@dataclass
+class ActionResult:
+    """Outcome of one scheduled action"""
+
+    at: float  # scheduled offset from the start of the run in seconds
+    name: str
+    lateness: float  # dispatch time minus deadline in seconds
+    duration: float  # time the call took (includes the ack wait)
+    ok: bool
+
+
+class ActionScheduler:
+    """
+    Runs timestamped KmboxNet actions against time.perf_counter deadlines.
+
+    Every deadline is absolute (start + at), so a late action does not push
+    the following ones back and errors do not accumulate over long sequences.
+    Waiting is a coarse sleep followed by a spin. While running, the
+    interpreter's thread switch interval is lowered so that other Python
+    threads cannot hold the GIL past a deadline for the default 5 ms.
+    """
+
+    def __init__(
+        self,
+        kmbox: KmboxNet,
+        spin: float = SPIN_THRESHOLD,
+        switch_interval: Optional[float] = 0.0002,
+    ):
+        """
+        Args:
+            kmbox (KmboxNet): Connected device
+            spin (float, optional): Length of the final busy wait in seconds. Defaults to SPIN_THRESHOLD.
+            switch_interval (float|None, optional): sys.setswitchinterval() during run(). None leaves it alone. Defaults to 0.0002.
+        """
+        self.kmbox = kmbox
+        self.spin = spin
+        self.switch_interval = switch_interval
+        self._actions: list[tuple[float, int, str, Callable, tuple]] = []
+
+    def add(
+        self, at: float, action: Union[str, Callable[..., Any]], *args
+    ) -> "ActionScheduler":
+        """
+        Schedule an action.
+
+        Args:
+            at (float): Offset from the start of run() in seconds
+            action (str|Callable): KmboxNet method name ("move", "left", "key_down", ...) or any callable
+            *args: Arguments for the action
+
+        Returns:
+            ActionScheduler: self, for chaining
+        """
+        if isinstance(action, str):
+            name = action
+            func = getattr(self.kmbox, action)
+        else:
+            name = getattr(action, "__name__", repr(action))
+            func = action
+        self._actions.append((at, len(self._actions), name, func, args))
+        return self
+
+    def clear(self):
+        self._actions.clear()
+
+    def __len__(self) -> int:
+        return len(self._actions)
+
+    def run(self, start: Optional[float] = None) -> list[ActionResult]:
+        """
+        Run all scheduled actions in time order.
+
+        Args:
+            start (float|None, optional): Start time on the time.perf_counter() clock. Defaults to now.
+
+        Returns:
+            list[ActionResult]: One result per action, in execution order
+        """
+        perf_counter = time.perf_counter
+        spin = self.spin
+        if start is None:
+            start = perf_counter()
+
+        previous_interval = sys.getswitchinterval()
+        if self.switch_interval is not None:
+            sys.setswitchinterval(self.switch_interval)
+
+        results = []
+        try:
+            for at, _, name, func, args in sorted(self._actions):
+                deadline = start + at
+                lateness = sleep_until(deadline, spin)
+                t0 = perf_counter()
+                try:
+                    ok = func(*args) is not False
+                except Exception as e:
+                    print(f"Warning:{e}")
+                    ok = False
+                results.append(
+                    ActionResult(at, name, lateness, perf_counter() - t0, ok)
+                )
+        finally:
+            sys.setswitchinterval(previous_interval)
+        return results
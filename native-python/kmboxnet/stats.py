@@ -0,0 +1,194 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+
+# upper bounds of the RTT histogram buckets in seconds (+Inf is implicit)
+RTT_BUCKETS = (
+    0.00005,
+    0.0001,
+    0.0002,
+    0.0005,
+    0.001,
+    0.002,
+    0.005,
+    0.01,
+    0.02,
+    0.05,
+    0.1,
+    0.2,
+    0.5,
+    1.0,
+    2.0,
+)
+
+
+class _Counters:
+    __slots__ = (
+        "sent",
+        "acked",
+        "timeouts",
+        "invalid",
+        "retransmits",
+        "bytes_sent",
+        "bytes_received",
+        "rtt_sum",
+        "rtt_buckets",
+    )
+
+    def __init__(self):
+        self.sent = 0
+        self.acked = 0
+        self.timeouts = 0
+        self.invalid = 0
+        self.retransmits = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.rtt_sum = 0.0
+        self.rtt_buckets = [0] * (len(RTT_BUCKETS) + 1)
+
+
+@dataclass
+class CommandStatsSnapshot:
+    """Counters and RTT histogram of one command ID"""
+
+    cmd: int
+    name: str
+    sent: int = 0
+    acked: int = 0
+    timeouts: int = 0
+    invalid: int = 0
+    retransmits: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    rtt_sum: float = 0.0
+    # per bucket counts (not cumulative), last one is +Inf
+    rtt_buckets: list[int] = field(default_factory=list)
+
+    @property
+    def rtt_count(self) -> int:
+        return sum(self.rtt_buckets)
+
+    @property
+    def rtt_mean(self) -> float:
+        count = self.rtt_count
+        return self.rtt_sum / count if count else 0.0
+
+    def rtt_quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding quantile q (inf if beyond 2s)"""
+        count = self.rtt_count
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for bound, n in zip(RTT_BUCKETS + (float("inf"),), self.rtt_buckets):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class CommandStats:
+    """Per-command instrumentation collected by KmboxNet when stats are enabled"""
+
+    def __init__(self, names: dict[int, str]):
+        self._names = names
+        self._counters: dict[int, _Counters] = {}
+        # datagrams that matched no command (wrong sender, short or unknown index)
+        self.stray = 0
+
+    def _get(self, cmd: int) -> _Counters:
+        counters = self._counters.get(cmd)
+        if counters is None:
+            counters = self._counters[cmd] = _Counters()
+        return counters
+
+    def on_send(self, cmd: int, nbytes: int):
+        counters = self._get(cmd)
+        counters.sent += 1
+        counters.bytes_sent += nbytes
+
+    def on_ack(self, cmd: int, rtt: float, nbytes: int):
+        counters = self._get(cmd)
+        counters.acked += 1
+        counters.bytes_received += nbytes
+        counters.rtt_sum += rtt
+        counters.rtt_buckets[bisect_left(RTT_BUCKETS, rtt)] += 1
+
+    def on_retransmit(self, cmd: int, nbytes: int):
+        counters = self._get(cmd)
+        counters.retransmits += 1
+        counters.bytes_sent += nbytes
+
+    def on_timeout(self, cmd: int):
+        self._get(cmd).timeouts += 1
+
+    def on_invalid(self, cmd: int, nbytes: int):
+        counters = self._get(cmd)
+        counters.invalid += 1
+        counters.bytes_received += nbytes
+
+    def snapshot(self) -> dict[str, CommandStatsSnapshot]:
+        """Copy of all counters keyed by command name"""
+        result = {}
+        for cmd, c in list(self._counters.items()):
+            name = self._names.get(cmd, f"0x{cmd:08X}")
+            result[name] = CommandStatsSnapshot(
+                cmd=cmd,
+                name=name,
+                sent=c.sent,
+                acked=c.acked,
+                timeouts=c.timeouts,
+                invalid=c.invalid,
+                retransmits=c.retransmits,
+                bytes_sent=c.bytes_sent,
+                bytes_received=c.bytes_received,
+                rtt_sum=c.rtt_sum,
+                rtt_buckets=list(c.rtt_buckets),
+            )
+        return result
+
+    def reset(self):
+        self._counters.clear()
+        self.stray = 0
+
+    def to_openmetrics(self, prefix: str = "kmboxnet") -> str:
+        """Render all counters in OpenMetrics text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+
+        counters = (
+            ("commands_sent", "sent", "Commands sent"),
+            ("commands_acked", "acked", "Commands acknowledged"),
+            ("command_timeouts", "timeouts", "Commands without response"),
+            ("invalid_responses", "invalid", "Responses with mismatching command"),
+            ("retransmits", "retransmits", "Commands sent again after RTO"),
+            ("sent_bytes", "bytes_sent", "Bytes sent"),
+            ("received_bytes", "bytes_received", "Bytes received"),
+        )
+        for metric, attr, help_text in counters:
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            lines.append(f"# HELP {prefix}_{metric} {help_text}.")
+            for name, s in snapshot.items():
+                value = getattr(s, attr)
+                lines.append(f'{prefix}_{metric}_total{{command="{name}"}} {value}')
+
+        lines.append(f"# TYPE {prefix}_stray_datagrams counter")
+        lines.append(f"# HELP {prefix}_stray_datagrams Datagrams matching no command.")
+        lines.append(f"{prefix}_stray_datagrams_total {self.stray}")
+
+        metric = f"{prefix}_command_rtt_seconds"
+        lines.append(f"# TYPE {metric} histogram")
+        lines.append(f"# HELP {metric} Command round trip time.")
+        for name, s in snapshot.items():
+            cumulative = 0
+            for bound, n in zip(RTT_BUCKETS, s.rtt_buckets):
+                cumulative += n
+                lines.append(
+                    f'{metric}_bucket{{command="{name}",le="{bound}"}} {cumulative}'
+                )
+            cumulative += s.rtt_buckets[-1]
+            lines.append(f'{metric}_bucket{{command="{name}",le="+Inf"}} {cumulative}')
+            lines.append(f'{metric}_sum{{command="{name}"}} {s.rtt_sum}')
+            lines.append(f'{metric}_count{{command="{name}"}} {cumulative}')
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
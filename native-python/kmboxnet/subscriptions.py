@@ -0,0 +1,128 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional, Union
+
+from .hidtable import HidKey
+
+# edge kinds delivered by Monitor.subscribe()
+BUTTON_DOWN = "button_down"
+BUTTON_UP = "button_up"
+KEY_DOWN = "key_down"
+KEY_UP = "key_up"
+WHEEL = "wheel"
+MOTION = "motion"
+EDGE_KINDS = (BUTTON_DOWN, BUTTON_UP, KEY_DOWN, KEY_UP, WHEEL, MOTION)
+
+
+@dataclass(frozen=True)
+class InputEdge:
+    """One change detected between two monitor reports"""
+
+    kind: str
+    # button bit (0x01 left, 0x02 right, ...) for button edges, HID key code
+    # (0xE0-0xE7 for modifiers) for key edges, held buttons for wheel/motion
+    code: int = 0
+    x: int = 0
+    y: int = 0
+    wheel: int = 0
+    time_stamp: float = 0.0
+
+
+def key_mask(keys: Union[Iterable[int], str, int]) -> int:
+    """
+    Bitmap with one bit per HID key code.
+
+    Args:
+        keys (Iterable[int]|str|int): Key codes, HidKey names joined by "+" ("LEFT_CTRL+LEFT_SHIFT+K"), or an existing bitmap
+
+    Returns:
+        int: 256-bit key bitmap
+    """
+    if isinstance(keys, int):
+        return keys
+    if isinstance(keys, str):
+        keys = [HidKey[name.strip().upper()] for name in keys.split("+")]
+    mask = 0
+    for key in keys:
+        mask |= 1 << key
+    return mask
+
+
+def key_codes(bitmap: int) -> list[int]:
+    """HID key codes set in a key bitmap, ascending"""
+    codes = []
+    while bitmap:
+        low = bitmap & -bitmap
+        codes.append(low.bit_length() - 1)
+        bitmap ^= low
+    return codes
+
+
+class Subscription:
+    """Registered interest in one edge kind; cancel() to unsubscribe"""
+
+    def __init__(
+        self,
+        monitor,
+        kind: str,
+        callback: Callable[[InputEdge], None],
+        mask: int = -1,
+    ):
+        self._monitor = monitor
+        self.kind = kind
+        self.callback = callback
+        # buttons bits or key bitmap of interest; -1 matches everything
+        self.mask = mask
+
+    def cancel(self):
+        self._monitor.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cancel()
+
+
+class AsyncSubscription:
+    """
+    Edges delivered to an asyncio event loop, consumed with `async for`.
+
+    The listener thread hands edges over with call_soon_threadsafe; the
+    buffer holds at most maxsize edges and drops the oldest beyond that.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.subscription: Optional[Subscription] = None
+        self.dropped = 0
+
+    def _deliver(self, edge: InputEdge):
+        self._loop.call_soon_threadsafe(self._put, edge)
+
+    def _put(self, edge: InputEdge):
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(edge)
+
+    async def get(self) -> InputEdge:
+        return await self._queue.get()
+
+    def __aiter__(self) -> "AsyncSubscription":
+        return self
+
+    async def __anext__(self) -> InputEdge:
+        return await self._queue.get()
+
+    def close(self):
+        if self.subscription is not None:
+            self.subscription.cancel()
+            self.subscription = None
+
+    async def __aenter__(self) -> "AsyncSubscription":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
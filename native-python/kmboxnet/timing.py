@@ -0,0 +1,31 @@
+import time
+
+# time.sleep() may overshoot by about a millisecond; the rest is spun
+SPIN_THRESHOLD = 0.002
+
+_perf_counter = time.perf_counter
+_sleep = time.sleep
+
+
+def sleep_until(deadline: float, spin: float = SPIN_THRESHOLD) -> float:
+    """
+    Wait until time.perf_counter() reaches deadline.
+
+    Sleeps coarsely while the deadline is further away than `spin`, then busy
+    waits for the remainder.
+
+    Args:
+        deadline (float): Target time on the time.perf_counter() clock
+        spin (float, optional): Length of the final busy wait in seconds. Defaults to SPIN_THRESHOLD.
+
+    Returns:
+        float: Lateness in seconds (time.perf_counter() - deadline), never negative
+    """
+    now = _perf_counter()
+    remaining = deadline - now
+    if remaining > spin:
+        _sleep(remaining - spin)
+        now = _perf_counter()
+    while now < deadline:
+        now = _perf_counter()
+    return now - deadline
@@ -0,0 +1,294 @@
+import math
+import threading
+import time
+from typing import Callable, Optional, Sequence
+
+from .kmbox import KmboxNet
+from .timing import sleep_until
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional
+    np = None
+
+# Easing functions map normalized time (0..1) to progress (0..1).
+# The built-in ones also work on numpy arrays; user supplied easings are
+# always called with floats.
+
+
+def linear(t):
+    return t
+
+
+def minimum_jerk(t):
+    """Minimum-jerk profile 10t^3 - 15t^4 + 6t^5 (smooth start and stop)"""
+    return t * t * t * (10.0 + t * (-15.0 + 6.0 * t))
+
+
+def ease_in_out_cubic(t):
+    """Cubic ease in/out"""
+    if np is not None and isinstance(t, np.ndarray):
+        return np.where(t < 0.5, 4.0 * t**3, 1.0 - (-2.0 * t + 2.0) ** 3 / 2.0)
+    return 4.0 * t**3 if t < 0.5 else 1.0 - (-2.0 * t + 2.0) ** 3 / 2.0
+
+
+# easings evaluated on a whole numpy batch at once
+_VECTORIZED = (linear, minimum_jerk, ease_in_out_cubic)
+
+
+class Trajectory:
+    """
+    Relative path of the cursor from (0, 0) to (x, y) over `duration` seconds.
+
+    Timing follows `easing`. Without control points the path is a straight
+    line; with control=((x1, y1), (x2, y2)) it is a cubic Bezier curve like
+    the one of move_bezier, with the curve parameter driven by `easing`.
+    """
+
+    def __init__(
+        self,
+        x: float,
+        y: float,
+        duration: float,
+        easing: Callable = minimum_jerk,
+        control: Optional[tuple[tuple[float, float], tuple[float, float]]] = None,
+    ):
+        """
+        Args:
+            x (float): Relative X-axis target in pixels
+            y (float): Relative Y-axis target in pixels
+            duration (float): Duration in seconds
+            easing (Callable, optional): Progress function of normalized time. Defaults to minimum_jerk.
+            control (tuple|None, optional): Bezier control points relative to the start. Defaults to None.
+        """
+        self.x = x
+        self.y = y
+        self.duration = duration
+        self.easing = easing
+        self.control = control
+
+    def ticks(self, rate_hz: float) -> int:
+        """Number of timer ticks at rate_hz (at least one)"""
+        return max(1, round(self.duration * rate_hz))
+
+    def positions(
+        self, start: int, count: int, total: int
+    ) -> tuple[Sequence[float], Sequence[float]]:
+        """
+        Positions at ticks start .. start+count-1 out of `total` ticks.
+
+        Computed as one numpy batch when numpy is installed; a custom easing
+        is still evaluated per tick with a float.
+
+        Returns:
+            tuple[list[float], list[float]]: X and Y positions
+        """
+        end = min(start + count, total + 1)
+        if np is not None:
+            t = np.minimum(np.arange(start, end, dtype=np.float64) / total, 1.0)
+            if self.easing in _VECTORIZED:
+                u = np.asarray(self.easing(t), dtype=np.float64)
+            else:
+                u = np.fromiter(map(self.easing, t.tolist()), np.float64, len(t))
+            xs, ys = self._curve(u)
+            return xs.tolist(), ys.tolist()
+
+        easing = self.easing
+        us = [easing(min(i / total, 1.0)) for i in range(start, end)]
+        points = [self._curve(u) for u in us]
+        return [p[0] for p in points], [p[1] for p in points]
+
+    def _curve(self, u):
+        if self.control is None:
+            return u * self.x, u * self.y
+        (x1, y1), (x2, y2) = self.control
+        v = 1.0 - u
+        a = 3.0 * v * v * u
+        b = 3.0 * v * u * u
+        c = u * u * u
+        return a * x1 + b * x2 + c * self.x, a * y1 + b * y2 + c * self.y
+
+    def deltas(self, rate_hz: float) -> list[tuple[int, int]]:
+        """
+        Integer per-tick moves, rounding with sub-pixel carry.
+
+        The sum of all deltas is exactly round(x), round(y).
+        """
+        total = self.ticks(rate_hz)
+        xs, ys = self.positions(1, total, total)
+        result = []
+        sent_x = sent_y = 0
+        for px, py in zip(xs, ys):
+            dx = round(px) - sent_x
+            dy = round(py) - sent_y
+            sent_x += dx
+            sent_y += dy
+            result.append((dx, dy))
+        return result
+
+
+class TrajectoryPlayer:
+    """
+    Streams a Trajectory through KmboxNet.move on a precise timer.
+
+    Unlike CMD_BEZIER_MOVE the motion can be observed (progress, sent),
+    cancelled or retargeted while it is running.
+    """
+
+    def __init__(self, kmbox: KmboxNet, rate_hz: float = 1000.0, batch: int = 256):
+        """
+        Args:
+            kmbox (KmboxNet): Connected device
+            rate_hz (float, optional): Tick rate. Defaults to 1000.0.
+            batch (int, optional): Positions computed at once. Defaults to 256.
+        """
+        self.kmbox = kmbox
+        self.rate_hz = rate_hz
+        self.batch = batch
+
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._retarget: Optional[tuple] = None
+        self.thread: Optional[threading.Thread] = None
+
+        # integer motion sent so far in the current play()
+        self.sent = (0, 0)
+        self.progress = 0.0
+        self.ok = True
+
+    @property
+    def is_running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def play(self, trajectory: Trajectory, wait: bool = True) -> bool:
+        """
+        Play trajectory, cancelling any trajectory still running.
+
+        Args:
+            trajectory (Trajectory): Path to play
+            wait (bool, optional): Block until finished. Defaults to True.
+
+        Returns:
+            bool: With wait, True if played to the end with every move acknowledged
+        """
+        self.cancel()
+        self._cancel.clear()
+        self._retarget = None
+        self.sent = (0, 0)
+        self.progress = 0.0
+        self.ok = True
+        self.thread = threading.Thread(
+            target=self._play_loop, args=(trajectory,), daemon=True
+        )
+        self.thread.start()
+        if not wait:
+            return True
+        return self.wait()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the current trajectory to finish.
+
+        Returns:
+            bool: True if played to the end with every move acknowledged
+        """
+        if self.thread is not None:
+            self.thread.join(timeout)
+        return self.ok and not self._cancel.is_set() and not self.is_running
+
+    def cancel(self):
+        """Stop the current trajectory where it is"""
+        self._cancel.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def retarget(
+        self,
+        x: float,
+        y: float,
+        duration: Optional[float] = None,
+        easing: Optional[Callable] = None,
+        control: Optional[tuple[tuple[float, float], tuple[float, float]]] = None,
+    ):
+        """
+        Change the target of the running trajectory.
+
+        The current control points are not carried over, since they belong to
+        the old target: without control the new path is a straight line from
+        the current position.
+
+        Args:
+            x (float): New X-axis target relative to where play() started
+            y (float): New Y-axis target relative to where play() started
+            duration (float|None, optional): Time to reach it. Defaults to the remaining time.
+            easing (Callable|None, optional): Defaults to the current easing.
+            control (tuple|None, optional): Bezier control points relative to where play() started. Defaults to None.
+        """
+        with self._lock:
+            self._retarget = (x, y, duration, easing, control)
+
+    def _play_loop(self, trajectory: Trajectory):
+        try:
+            self._play(trajectory)
+        except Exception as e:
+            self.ok = False
+            print(f"Trajectory playback error: {e}")
+
+    def _play(self, trajectory: Trajectory):
+        period = 1.0 / self.rate_hz
+        perf_counter = time.perf_counter
+        move = self.kmbox.move
+
+        origin_x = origin_y = 0.0
+        total = trajectory.ticks(self.rate_hz)
+        tick = 0
+        start = perf_counter()
+        batch_start = 1
+        xs: Sequence[float] = []
+        ys: Sequence[float] = []
+        pos_x = pos_y = 0.0
+        sent_x = sent_y = 0
+
+        while tick < total and not self._cancel.is_set():
+            if self._retarget is not None:
+                with self._lock:
+                    retarget, self._retarget = self._retarget, None
+                x, y, duration, easing, control = retarget
+                if duration is None:
+                    duration = (total - tick) * period
+                if control is not None:
+                    control = tuple((cx - pos_x, cy - pos_y) for cx, cy in control)
+                # continue from where the current path is now
+                trajectory = Trajectory(
+                    x - pos_x,
+                    y - pos_y,
+                    duration,
+                    easing or trajectory.easing,
+                    control,
+                )
+                origin_x, origin_y = pos_x, pos_y
+                total = trajectory.ticks(self.rate_hz)
+                tick = 0
+                start = perf_counter()
+                xs, ys = [], []
+
+            tick += 1
+            sleep_until(start + tick * period)
+            # skip ticks when a round trip took longer than one period
+            tick = min(total, max(tick, math.floor((perf_counter() - start) / period)))
+
+            if not batch_start <= tick < batch_start + len(xs):
+                batch_start = tick
+                xs, ys = trajectory.positions(tick, self.batch, total)
+            pos_x = origin_x + xs[tick - batch_start]
+            pos_y = origin_y + ys[tick - batch_start]
+
+            dx = round(pos_x) - sent_x
+            dy = round(pos_y) - sent_y
+            if dx or dy:
+                if not move(dx, dy):
+                    self.ok = False
+                sent_x += dx
+                sent_y += dy
+                self.sent = (sent_x, sent_y)
+            self.progress = tick / total